@@ -1,6 +1,27 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class NoticeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notice'
+
+    def ready(self):
+        from notice.cache import invalidate_judge_cache, invalidate_notice_pages
+        from notice.events import broadcast_event
+        from notice.registry import type_registry
+        from notice.signals import notice_published
+
+        for model_name in type_registry.models:
+            model = self.get_model(model_name)
+            post_save.connect(type_registry.on_change, sender=model, dispatch_uid='notice_registry_save_' + model_name)
+            post_delete.connect(type_registry.on_change, sender=model, dispatch_uid='notice_registry_delete_' + model_name)
+            post_save.connect(invalidate_judge_cache, sender=model, dispatch_uid='notice_judge_save_' + model_name)
+            post_delete.connect(invalidate_judge_cache, sender=model, dispatch_uid='notice_judge_delete_' + model_name)
+
+        notice_store = self.get_model('NoticeStore')
+        post_save.connect(invalidate_notice_pages, sender=notice_store, dispatch_uid='notice_page_save')
+        post_delete.connect(invalidate_notice_pages, sender=notice_store, dispatch_uid='notice_page_delete')
+        notice_published.connect(invalidate_notice_pages, dispatch_uid='notice_page_publish')
+        post_save.connect(broadcast_event, sender=notice_store, dispatch_uid='notice_event_save')
+        notice_published.connect(broadcast_event, dispatch_uid='notice_event_publish')
@@ -0,0 +1,20 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : async urls, include them under their own prefix and serve them with ASGI:
+           path('notice/async/', include('notice.async_urls'))
+@Author  : Rey
+@Time    : 2026-10-18 15:00:00
+"""
+from django.urls import path
+
+from notice.views import asynchronous
+from notice.views import stream
+
+urlpatterns = [
+    path('client/', asynchronous.list_notice, name='async-client-list-notice'),
+    path('client/<int:pk>/', asynchronous.some_notice, name='async-client-retrieve-notice'),
+    path('client/status/', asynchronous.notice_status, name='async-client-notice-status'),
+    path('privates/', asynchronous.privates, name='async-privates'),
+    path('backlogs/', asynchronous.backlogs, name='async-backlogs'),
+    path('stream/', stream.notice_stream, name='notice-stream'),
+]
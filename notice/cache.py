@@ -0,0 +1,137 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : django cache backed helpers
+@Author  : Rey
+@Time    : 2026-10-18 13:00:00
+"""
+import hashlib
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+
+from notice.settings import (
+    NOTICE_ALLOWED_TYPED_CLASS, NOTICE_CACHE_ALIAS, NOTICE_HANDLER_CACHE_TIMEOUT, NOTICE_JUDGE_CACHE_TIMEOUT,
+    NOTICE_PAGE_CACHE_TIMEOUT
+)
+
+
+JUDGE_VERSION_KEY = 'notice:judge:version'
+PAGE_VERSION_KEY = 'notice:page:version'
+HANDLER_VERSION_KEY = 'notice:handler:version'
+REGISTRY_VERSION_KEY = 'notice:registry:version'
+
+
+def _version(cache, key):
+    """random token instead of a counter: an evicted version never brings back stale entries"""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def _judge_key(cache, receiver, kwargs):
+    receiver_version_key = '{}:{}'.format(JUDGE_VERSION_KEY, receiver)
+    params = hashlib.md5(repr(sorted(kwargs.items())).encode()).hexdigest()
+    return 'notice:judge:{}:{}:{}:{}'.format(
+        _version(cache, JUDGE_VERSION_KEY), _version(cache, receiver_version_key), receiver, params
+    )
+
+
+def judge_allowed_types(receiver, **kwargs):
+    """NOTICE_ALLOWED_TYPED_CLASS(receiver, **kwargs).judge(), cached for NOTICE_JUDGE_CACHE_TIMEOUT seconds"""
+    if not NOTICE_JUDGE_CACHE_TIMEOUT:
+        return NOTICE_ALLOWED_TYPED_CLASS(receiver=receiver, **kwargs).judge()
+
+    cache = caches[NOTICE_CACHE_ALIAS]
+    key = _judge_key(cache, receiver, kwargs)
+    allowed = cache.get(key)
+    if allowed is None:
+        allowed = NOTICE_ALLOWED_TYPED_CLASS(receiver=receiver, **kwargs).judge()
+        cache.set(key, allowed, NOTICE_JUDGE_CACHE_TIMEOUT)
+    return allowed
+
+
+def invalidate_judge_cache(receiver=None, **kwargs):
+    """drop cached judge() results of one receiver, or of everyone when receiver is None"""
+    key = JUDGE_VERSION_KEY if receiver is None else '{}:{}'.format(JUDGE_VERSION_KEY, receiver)
+    caches[NOTICE_CACHE_ALIAS].set(key, uuid.uuid4().hex, None)
+
+
+def _page_key(cache, key_parts):
+    return 'notice:page:{}:{}'.format(
+        _version(cache, PAGE_VERSION_KEY), hashlib.md5(repr(key_parts).encode()).hexdigest()
+    )
+
+
+def cached_notice_page(key_parts: tuple, build):
+    """
+    share a client notice list page between every receiver with the same allowed types
+
+    `key_parts` holds everything the page depends on except the receiver, `build()` returns the page;
+    is_read is never cached, callers overlay it per receiver
+    """
+    if not NOTICE_PAGE_CACHE_TIMEOUT:
+        return build()
+
+    cache = caches[NOTICE_CACHE_ALIAS]
+    key = _page_key(cache, key_parts)
+    page = cache.get(key)
+    if page is None:
+        page = build()
+        cache.set(key, page, NOTICE_PAGE_CACHE_TIMEOUT)
+    return page
+
+
+async def acached_notice_page(key_parts: tuple, build):
+    """cached_notice_page() for async views, `build()` is a coroutine function"""
+    if not NOTICE_PAGE_CACHE_TIMEOUT:
+        return await build()
+
+    cache = caches[NOTICE_CACHE_ALIAS]
+    key = await sync_to_async(_page_key)(cache, key_parts)
+    page = await cache.aget(key)
+    if page is None:
+        page = await build()
+        await cache.aset(key, page, NOTICE_PAGE_CACHE_TIMEOUT)
+    return page
+
+
+def invalidate_notice_pages(*args, **kwargs):
+    """drop every cached notice page: on notice create/update/delete and on publish"""
+    caches[NOTICE_CACHE_ALIAS].set(PAGE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def cached_handler_list(initiator: str, key_parts: tuple, build):
+    """handler list page of `initiator`, cached for NOTICE_HANDLER_CACHE_TIMEOUT seconds"""
+    if not NOTICE_HANDLER_CACHE_TIMEOUT:
+        return build()
+
+    cache = caches[NOTICE_CACHE_ALIAS]
+    key = 'notice:handler:{}:{}:{}'.format(
+        _version(cache, '{}:{}'.format(HANDLER_VERSION_KEY, initiator)), initiator,
+        hashlib.md5(repr(key_parts).encode()).hexdigest()
+    )
+    handlers = cache.get(key)
+    if handlers is None:
+        handlers = build()
+        cache.set(key, handlers, NOTICE_HANDLER_CACHE_TIMEOUT)
+    return handlers
+
+
+def invalidate_handler_list(initiator: str):
+    """drop every cached handler list page of `initiator`: on backlog create and handle"""
+    if initiator is None:
+        return
+    caches[NOTICE_CACHE_ALIAS].set('{}:{}'.format(HANDLER_VERSION_KEY, initiator), uuid.uuid4().hex, None)
+
+
+def registry_version():
+    """shared token of the type registry, every process reloads its rows once it changes"""
+    return _version(caches[NOTICE_CACHE_ALIAS], REGISTRY_VERSION_KEY)
+
+
+def invalidate_registry():
+    """make every process reload the type registry: on NoticeType/ReceiverType save and delete"""
+    caches[NOTICE_CACHE_ALIAS].set(REGISTRY_VERSION_KEY, uuid.uuid4().hex, None)
@@ -0,0 +1,121 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : unread count change events for the SSE stream
+@Author  : Rey
+@Time    : 2026-10-18 14:00:00
+"""
+import logging
+import select
+import threading
+import time
+
+from django.db import connection, connections, transaction
+
+from notice.settings import NOTICE_EVENT_BACKEND
+
+
+logger = logging.getLogger(__name__)
+
+# receiver of events which concern every receiver, e.g. a broadcast notice was published
+BROADCAST = '*'
+CHANNEL = 'notice_events'
+
+
+class LocalBroker:
+    """in-process fan-out of receiver ids to the asyncio queues of open streams"""
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, receiver: str, loop, queue):
+        with self._lock:
+            self._subscribers.setdefault(receiver, set()).add((loop, queue))
+
+    def unsubscribe(self, receiver: str, loop, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(receiver)
+            if subscribers:
+                subscribers.discard((loop, queue))
+                if not subscribers:
+                    del self._subscribers[receiver]
+
+    def publish(self, receivers):
+        with self._lock:
+            if BROADCAST in receivers:
+                # every stream subscribes under BROADCAST too: one event per stream
+                receivers = (BROADCAST,)
+            targets = [(r, s) for r in receivers for s in self._subscribers.get(r, ())]
+        for receiver, (loop, queue) in targets:
+            loop.call_soon_threadsafe(queue.put_nowait, receiver)
+
+
+class PostgresBroker(LocalBroker):
+    """
+    cross-process fan-out over LISTEN/NOTIFY
+
+    publish() sends pg_notify on the current database connection, so events are delivered when the
+    writing transaction commits; a daemon thread LISTENs on its own connection and feeds LocalBroker
+    """
+    def __init__(self, alias: str = 'default') -> None:
+        super().__init__()
+        self.alias = alias
+        self._thread = None
+
+    def subscribe(self, receiver: str, loop, queue):
+        super().subscribe(receiver, loop, queue)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._listen, name='notice-event-listener', daemon=True)
+                    self._thread.start()
+
+    def publish(self, receivers):
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, r) FROM unnest(%s::text[]) r', [CHANNEL, list(receivers)])
+
+    def _listen(self):
+        while True:
+            try:
+                wrapper = connections[self.alias]
+                conn = wrapper.get_new_connection(wrapper.get_connection_params())
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute('LISTEN {}'.format(CHANNEL))
+                while True:
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    receivers = set()
+                    while conn.notifies:
+                        receivers.add(conn.notifies.pop(0).payload)
+                    if receivers:
+                        super().publish(receivers)
+            except Exception:
+                logger.exception('notice: event listener lost its connection, reconnecting')
+                time.sleep(1)
+
+
+def _get_broker():
+    if NOTICE_EVENT_BACKEND == 'postgres':
+        return PostgresBroker()
+    return LocalBroker()
+
+
+broker = _get_broker()
+
+
+def broadcast_event(*args, **kwargs):
+    """signal receiver: a notice was saved or published, every stream recounts"""
+    publish_event(BROADCAST)
+
+
+def publish_event(*receivers):
+    """tell open streams of `receivers` (or BROADCAST) that their unread counts may have changed"""
+    receivers = {str(receiver) for receiver in receivers}
+    if not receivers:
+        return
+    if connection.in_atomic_block and NOTICE_EVENT_BACKEND != 'postgres':
+        # local subscribers must not recount before the writing transaction is visible
+        transaction.on_commit(lambda: broker.publish(receivers))
+    else:
+        broker.publish(receivers)
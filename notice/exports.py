@@ -0,0 +1,99 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : streaming NDJSON/CSV export of backlogs and private notices
+@Author  : Rey
+@Time    : 2026-10-18 15:30:00
+"""
+import csv
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from notice.models import Backlog, PrivateNotice
+from notice.settings import NOTICE_EXPORT_CHUNK_SIZE
+from notice.views.backlog import filter_conditions
+
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+BACKLOG_EXPORT_FIELDS = (
+    'id', 'receiver', 'created_at', 'creator', 'initiator', 'initiator_name', 'obj_key', 'obj_name', 'obj_status',
+    'is_read', 'read_at', 'is_done', 'done_at', 'handler', 'candidates', 'batch', 'data',
+)
+
+# read through the batch, see backlog_export_queryset()
+BACKLOG_BATCH_EXPORT_FIELDS = (
+    'creator', 'initiator', 'initiator_name', 'obj_key', 'obj_name', 'obj_status', 'done_at', 'handler', 'candidates',
+    'data',
+)
+
+PRIVATE_EXPORT_FIELDS = (
+    'id', 'receiver', 'created_at', 'creator', 'title', 'content', 'data', 'is_read', 'read_at', 'batch',
+)
+
+# read through the message, see private_export_queryset()
+PRIVATE_MESSAGE_EXPORT_FIELDS = ('creator', 'title', 'content', 'data')
+
+
+class _Echo:
+    """file-like object for csv.writer: writerow() returns the line instead of buffering it"""
+    def write(self, value):
+        return value
+
+
+def needs_receiver(params: dict) -> bool:
+    """filter_conditions() params only defined for one receiver: backlog_type=3 is launched by the receiver"""
+    return bool(params) and params.get('backlog_type') == '3'
+
+
+def backlog_export_queryset(receiver: str = None, params: dict = None):
+    """backlogs of `receiver`, of everyone when None, narrowed by checked filter_conditions() params"""
+    if receiver is None and needs_receiver(params):
+        raise ValueError('backlog_type=3 needs a receiver')
+    queryset = Backlog.objects.all() if receiver is None else Backlog.objects.filter(receiver=receiver)
+    if params:
+        queryset = queryset.filter(filter_conditions(receiver, params))
+    return queryset.annotate(**{name: F('batch__{}'.format(name)) for name in BACKLOG_BATCH_EXPORT_FIELDS})
+
+
+def private_export_queryset(receiver: str = None, title: str = None, is_index: bool = False):
+    """private notices of `receiver`, of everyone when None; same filters as privates/"""
+    queryset = PrivateNotice.objects.all() if receiver is None else PrivateNotice.objects.filter(receiver=receiver)
+    if is_index:
+        queryset = queryset.filter(is_read=False)
+    if title:
+        queryset = queryset.filter(batch__title__contains=title)
+    return queryset.annotate(**{name: F('batch__{}'.format(name)) for name in PRIVATE_MESSAGE_EXPORT_FIELDS})
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def export_lines(queryset, fields: tuple, fmt: str = 'ndjson', chunk_size: int = NOTICE_EXPORT_CHUNK_SIZE):
+    """
+    yield `queryset` line by line in id order
+
+    rows come through a server-side cursor `chunk_size` at a time as tuples, so memory stays flat whatever the count
+    """
+    rows = queryset.order_by('id').values_list(*fields).iterator(chunk_size=chunk_size)
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([_csv_value(value) for value in row])
+        return
+
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
@@ -13,7 +13,7 @@ from django.core.exceptions import ValidationError
 from django.utils.timezone import get_default_timezone, now as timezone_now
 from django.utils.translation import gettext_lazy as _
 
-from notice.models import NoticeType, ReceiverType
+from notice.registry import type_registry
 from notice.response import ValidationFailedDetailEnum
 from notice.settings import NOTICE_DATETIME_FORMAT
 
@@ -41,7 +41,7 @@ class NoticeForm(forms.Form):
         type_id = self.cleaned_data['type_id']
         if not type_id:
             return type_id
-        if not NoticeType.objects.filter(pk=type_id).exists():
+        if type_id not in type_registry.ids('NoticeType'):
             raise ValidationError(ValidationFailedDetailEnum.NOTICE_TYPE.value)
         return type_id
 
@@ -49,8 +49,7 @@ class NoticeForm(forms.Form):
         receiver_type_ids = self.cleaned_data['receiver_type_ids']
         if not receiver_type_ids:
             return receiver_type_ids
-        right_ids = ReceiverType.objects.filter(pk__in=receiver_type_ids).values_list('id', flat=True)
-        if set(receiver_type_ids) != set(right_ids):
+        if set(receiver_type_ids) - type_registry.ids('ReceiverType'):
             raise ValidationError(ValidationFailedDetailEnum.RECEIVER_TYPE.value)
         return receiver_type_ids
 
@@ -60,12 +59,15 @@ class NoticeForm(forms.Form):
             raise ValidationError(ValidationFailedDetailEnum.SEND_WAY.value)
         if send_way == self.SendWayEnum.NO.value:
             self.cleaned_data['is_draft'] = True
+            self.cleaned_data['is_published'] = False
             return None
         if send_way == self.SendWayEnum.NOW.value:
             self.cleaned_data['is_draft'] = False
+            self.cleaned_data['is_published'] = True
             return timezone_now()
         if send_way == self.SendWayEnum.TIMING.value:
             self.cleaned_data['is_draft'] = False
+            self.cleaned_data['is_published'] = False
             publish_at = self.cleaned_data.get('publish_at')
             if not publish_at:
                 raise ValidationError(ValidationFailedDetailEnum.SEND_WAY.value)
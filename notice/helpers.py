@@ -4,9 +4,18 @@
 @Author  : Rey
 @Time    : 2022-04-02 10:58:14
 """
+import json
+import math
 from abc import ABCMeta, abstractmethod
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 
-from django.apps import apps
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F
+from django.http import JsonResponse
+
+from notice.registry import type_registry
 
 
 class BaseGetAllowedTypes(metaclass=ABCMeta):
@@ -14,20 +23,14 @@ class BaseGetAllowedTypes(metaclass=ABCMeta):
     def __init__(self) -> None:
         self.done_receiver_type = list()
         self.done_notice_type = list()
-        self._all_notice_type_names = None
-        self._all_receiver_type_names = None
 
     @property
     def all_notice_type_names(self):
-        if not self._all_notice_type_names:
-            self._all_notice_type_names = dict(apps.get_model('notice.NoticeType').objects.all().values_list('name', 'id'))
-        return self._all_notice_type_names
+        return type_registry.names('NoticeType')
 
     @property
     def all_receiver_type_names(self):
-        if not self._all_receiver_type_names:
-            self._all_receiver_type_names = dict(apps.get_model('notice.ReceiverType').objects.all().values_list('name', 'id'))
-        return self._all_receiver_type_names
+        return type_registry.names('ReceiverType')
 
     @abstractmethod
     def judge_notice_receiver_types(self) -> list:
@@ -47,3 +50,132 @@ class BaseGetAllowedTypes(metaclass=ABCMeta):
                 'not judge all existed receiver types: to judge={}'.format(set(self.all_receiver_type_names) - set(self.done_receiver_type))
             )
         return self.judge_notice_types(), self.judge_notice_receiver_types()
+
+
+TITLE_SEARCH_MODES = ('contains', 'icontains', 'similar')
+
+# alias: pg_trgm installed, see trigram_installed()
+_trigram_installed = {}
+
+
+def trigram_installed(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    whether pg_trgm is installed, looked up once per process
+
+    contains/icontains only lose their index without it, `similar` has no `%` operator or similarity() to call
+    """
+    if using not in _trigram_installed:
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_installed[using] = cursor.fetchone() is not None
+    return _trigram_installed[using]
+
+
+def search_title(queryset, title: str, mode: str = 'contains', field: str = 'title'):
+    """
+    filter `queryset` on `field` and order it: by `-id`, or by trigram similarity for mode `similar`
+
+    LIKE, ILIKE and `%` are all served by the pg_trgm GIN index on the title column when it exists,
+    callers check trigram_installed() before asking for `similar`
+    """
+    if not title:
+        return queryset.order_by('-id')
+    if mode == 'similar':
+        return queryset.filter(TrigramSimilar(F(field), title)).annotate(
+            similarity=TrigramSimilarity(field, title)
+        ).order_by('-similarity', '-id')
+    return queryset.filter(**{'{}__{}'.format(field, mode): title}).order_by('-id')
+
+
+def load_json_object(body: bytes):
+    """the JSON object of a request body, an empty body reads as {}: None if the body is not an object"""
+    try:
+        data = json.loads(body or '{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def is_int(value) -> bool:
+    """a JSON integer: bool is an int subclass but not an id"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_int_list(value) -> bool:
+    return isinstance(value, list) and all(is_int(i) for i in value)
+
+
+def encode_cursor(pk: int) -> str:
+    """opaque continuation token for keyset pagination"""
+    return urlsafe_b64encode(str(pk).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """return the last seen pk, or None if the cursor is invalid"""
+    try:
+        pk = urlsafe_b64decode((cursor + '=' * (-len(cursor) % 4)).encode()).decode()
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not pk.isdigit():
+        return None
+    return int(pk)
+
+
+def _after_cursor(queryset, cursor, size):
+    """`size` + 1 rows by `-id` after `cursor`: the extra row tells whether there is a next page"""
+    if cursor:
+        queryset = queryset.filter(id__lt=decode_cursor(cursor))
+    return queryset.order_by('-id')[:size + 1]
+
+
+def _cursor_page(rows: list, size: int):
+    next_cursor = encode_cursor(rows[size - 1].id) if len(rows) > size else None
+    return rows[:size], next_cursor
+
+
+def paginate_by_cursor(queryset, cursor, size):
+    """slice `queryset` by `-id` after `cursor`: return (rows, next_cursor)"""
+    return _cursor_page(list(_after_cursor(queryset, cursor, size)), size)
+
+
+async def apaginate_by_cursor(queryset, cursor, size):
+    """paginate_by_cursor() with async iteration"""
+    return _cursor_page([row async for row in _after_cursor(queryset, cursor, size)], size)
+
+
+def _page_slice(page: int, size: int) -> slice:
+    return slice((page - 1) * size, page * size)
+
+
+def paginate_by_page(queryset, page, size):
+    """count the ordered `queryset` and slice page `page`: return (total, max_page, rows)"""
+    total = queryset.count()
+    max_page = math.ceil(total / size)
+    rows = list(queryset[_page_slice(page, size)]) if page <= max_page else []
+    return total, max_page, rows
+
+
+async def apaginate_by_page(queryset, page, size):
+    """paginate_by_page() with async count and iteration"""
+    total = await queryset.acount()
+    max_page = math.ceil(total / size)
+    rows = [row async for row in queryset[_page_slice(page, size)]] if page <= max_page else []
+    return total, max_page, rows
+
+
+def page_response(total: int, max_page: int, page: int, size: int, items: list):
+    return JsonResponse(data={
+        'total': total,
+        'max_page': max_page,
+        'page': page,
+        'items': items,
+        'size': size
+    })
+
+
+def cursor_response(items: list, next_cursor, size: int):
+    return JsonResponse(data={
+        'items': items,
+        'next_cursor': next_cursor,
+        'size': size
+    })
@@ -0,0 +1,91 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : chunked fan-out of private notices
+@Author  : Rey
+@Time    : 2026-10-18 16:00:00
+"""
+import io
+import uuid
+from itertools import chain, islice
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from notice.events import publish_event
+from notice.models import PrivateMessage, PrivateNotice
+from notice.settings import NOTICE_PRIVATE_BATCH_SIZE
+
+
+COPY_FIELDS = ('created_at', 'updated_at', 'receiver', 'is_read', 'batch')
+
+
+def _chunks(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _copy_value(value) -> str:
+    """csv field for COPY: only an unquoted empty field reads back as NULL"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+def _copy_privates(using: str, receivers: list, batch: str):
+    """one COPY ... FROM STDIN of the delivery rows of `receivers`"""
+    now = timezone.now()
+    buffer = io.StringIO()
+    for receiver in receivers:
+        buffer.write(','.join(_copy_value(value) for value in (now, now, receiver, False, batch)))
+        buffer.write('\n')
+
+    sql = 'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(
+        PrivateNotice._meta.db_table,
+        ', '.join(PrivateNotice._meta.get_field(name).column for name in COPY_FIELDS)
+    )
+    with connections[using].cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy_expert'):
+            buffer.seek(0)
+            raw.copy_expert(sql, buffer)
+        else:
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def create_private_notices(values: dict, receivers, batch_size: int = NOTICE_PRIVATE_BATCH_SIZE, use_copy: bool = False):
+    """
+    store `values` once as a PrivateMessage and deliver it to every item of the iterable `receivers`,
+    `batch_size` delivery rows per statement, in one transaction
+
+    return (count, batch, ids), ids only when the send fit in a single bulk_create batch;
+    no receivers stores nothing and returns (0, None, [])
+    """
+    chunks = _chunks(receivers, batch_size)
+    first = next(chunks, None)
+    if first is None:
+        return 0, None, []
+
+    using = router.db_for_write(PrivateNotice)
+    batch = str(uuid.uuid4())
+    count = 0
+    ids = None
+    with transaction.atomic(using=using):
+        PrivateMessage.objects.using(using).create(**values, batch=batch)
+        for chunk in chain([first], chunks):
+            if use_copy:
+                _copy_privates(using, chunk, batch)
+            else:
+                objs = PrivateNotice.objects.using(using).bulk_create(
+                    [PrivateNotice(receiver=receiver, batch_id=batch) for receiver in chunk]
+                )
+                ids = [obj.id for obj in objs] if not count else None
+            count += len(chunk)
+            publish_event(*chunk)
+    return count, batch, ids
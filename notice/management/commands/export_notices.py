@@ -0,0 +1,62 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : python manage.py export_notices backlog|private [--receiver 1] [--format csv] [--output file]
+                                          [--filter handle_status=1 ...] [--title x] [--unread]
+@Author  : Rey
+@Time    : 2026-10-18 15:30:00
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notice.exports import (
+    BACKLOG_EXPORT_FIELDS, EXPORT_FORMATS, PRIVATE_EXPORT_FIELDS,
+    backlog_export_queryset, export_lines, needs_receiver, private_export_queryset
+)
+from notice.settings import NOTICE_EXPORT_CHUNK_SIZE
+from notice.views.backlog import check_params
+
+
+class Command(BaseCommand):
+    help = 'Stream backlogs or private notices of one receiver, or of everyone, as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=('backlog', 'private'))
+        parser.add_argument('--receiver', help='export only this receiver, everyone when omitted')
+        parser.add_argument('--format', choices=tuple(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--output', help='write to this file instead of stdout')
+        parser.add_argument('--chunk-size', type=int, default=NOTICE_EXPORT_CHUNK_SIZE)
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='KEY=VALUE',
+            help='backlog filter as accepted by backlogs/, e.g. handle_status=1, repeatable'
+        )
+        parser.add_argument('--title', help='private notice title contains')
+        parser.add_argument('--unread', action='store_true', help='only unread private notices')
+
+    def handle(self, *args, **options):
+        if options['kind'] == 'backlog':
+            params = {}
+            for item in options['filter']:
+                key, sep, value = item.partition('=')
+                if not sep:
+                    raise CommandError('invalid filter: {}'.format(item))
+                params[key] = value
+            is_valid, result = check_params(params)
+            if not is_valid:
+                raise CommandError(json.loads(result.content)['detail'])
+            if options['receiver'] is None and needs_receiver(params):
+                raise CommandError('backlog_type=3 needs --receiver')
+            queryset, fields = backlog_export_queryset(options['receiver'], params), BACKLOG_EXPORT_FIELDS
+        else:
+            queryset = private_export_queryset(options['receiver'], options['title'], options['unread'])
+            fields = PRIVATE_EXPORT_FIELDS
+
+        lines = export_lines(queryset, fields, options['format'], options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+            for line in lines:
+                f.write(line)
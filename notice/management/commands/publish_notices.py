@@ -0,0 +1,33 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : python manage.py publish_notices [--interval 5]
+@Author  : Rey
+@Time    : 2026-10-18 13:30:00
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from notice.publisher import publish_due_notices
+
+
+class Command(BaseCommand):
+    help = 'Publish timing notices whose publish time has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='keep running and check every INTERVAL seconds, run once when 0'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            ids = publish_due_notices()
+            if ids:
+                self.stdout.write('published: {}'.format(', '.join(str(pk) for pk in ids)))
+            if not interval:
+                break
+            time.sleep(interval)
+            close_old_connections()
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notice', '0008_remove_backlog_redirect_url_remove_backlog_title_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='privatenotice',
+            name='content',
+            field=models.TextField(null=True, verbose_name='content'),
+        ),
+    ]
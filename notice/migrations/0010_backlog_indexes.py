@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('notice', '0009_privatenotice_content'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='backlog',
+            index=models.Index(fields=['receiver', 'is_done', '-id'], name='notice_backlog_receiver_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='backlog',
+            index=models.Index(fields=['initiator'], name='notice_backlog_initiator_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='backlog',
+            index=models.Index(fields=['batch'], name='notice_backlog_batch_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='backlog',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['candidates'], name='notice_backlog_candidates_gin'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:50
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('notice', '0010_backlog_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='privatenotice',
+            index=models.Index(fields=['receiver', '-id'], name='notice_private_receiver_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='privatenotice',
+            index=models.Index(
+                condition=models.Q(('is_read', False)), fields=['receiver', '-id'], name='notice_private_unread_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:00
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('notice', '0011_privatenotice_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='noticestore',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['receiver_type_ids'], name='notice_store_receiver_gin'),
+        ),
+        AddIndexConcurrently(
+            model_name='noticestore',
+            index=models.Index(
+                condition=models.Q(('is_deleted', False), ('is_draft', False)),
+                fields=['notice_type', 'publish_at', 'id'],
+                name='notice_store_visible_idx',
+            ),
+        ),
+    ]
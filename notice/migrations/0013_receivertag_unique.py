@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('notice', '0012_noticestore_indexes'),
+    ]
+
+    operations = [
+        # keep the earliest tag of every (receiver, noticestore) pair
+        migrations.RunSQL(
+            sql='''
+                DELETE FROM notice_receiver_tag t
+                USING notice_receiver_tag d
+                WHERE t.receiver = d.receiver
+                  AND t.noticestore_id = d.noticestore_id
+                  AND t.id > d.id
+            ''',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        # build the index without blocking writes, then promote it: ADD CONSTRAINT USING INDEX is catalog only
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='receivertag',
+                    constraint=models.UniqueConstraint(
+                        fields=('receiver', 'noticestore'), name='notice_receiver_tag_unique'
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql=[
+                        # an INVALID leftover of a failed build: a duplicate written after the DELETE, run again
+                        'DROP INDEX CONCURRENTLY IF EXISTS notice_receiver_tag_unique',
+                        'CREATE UNIQUE INDEX CONCURRENTLY notice_receiver_tag_unique '
+                        'ON notice_receiver_tag (receiver, noticestore_id)',
+                    ],
+                    reverse_sql=migrations.RunSQL.noop,
+                ),
+                migrations.RunSQL(
+                    sql='ALTER TABLE notice_receiver_tag ADD CONSTRAINT notice_receiver_tag_unique '
+                        'UNIQUE USING INDEX notice_receiver_tag_unique',
+                    # drops the index with it
+                    reverse_sql='ALTER TABLE notice_receiver_tag DROP CONSTRAINT notice_receiver_tag_unique',
+                ),
+            ],
+        ),
+    ]
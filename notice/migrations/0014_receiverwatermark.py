@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notice', '0013_receivertag_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiverWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='create time')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='latest update time')),
+                ('receiver', models.CharField(max_length=64, unique=True, verbose_name='receiver')),
+                ('read_until', models.DateTimeField(verbose_name='read until')),
+            ],
+            options={
+                'db_table': 'notice_receiver_watermark',
+            },
+        ),
+    ]
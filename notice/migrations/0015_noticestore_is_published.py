@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notice', '0014_receiverwatermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticestore',
+            name='is_published',
+            field=models.BooleanField(default=False, verbose_name='published tag'),
+        ),
+        migrations.RunSQL(
+            sql='UPDATE notice_noticestore SET is_published = true WHERE NOT is_draft AND publish_at <= now()',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:38
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('notice', '0015_noticestore_is_published'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='noticestore',
+            index=models.Index(
+                condition=models.Q(('is_deleted', False), ('is_published', True)),
+                fields=['notice_type', 'id'],
+                name='notice_store_published_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('notice', '0016_noticestore_published_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='privatenotice',
+            name='batch',
+            field=models.CharField(max_length=36, null=True, verbose_name='batch'),
+        ),
+        AddIndexConcurrently(
+            model_name='privatenotice',
+            index=models.Index(fields=['batch'], name='notice_private_batch_idx'),
+        ),
+    ]
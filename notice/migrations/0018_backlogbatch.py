@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notice', '0017_privatenotice_batch'),
+    ]
+
+    # additive only: old code keeps reading and writing the payload columns of notice_backlog,
+    # 0022 backfills notice_backlog_batch and 0023 drops the columns
+    operations = [
+        migrations.CreateModel(
+            name='BacklogBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='create time')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='latest update time')),
+                ('batch', models.CharField(max_length=36, unique=True, verbose_name='batch')),
+                ('creator', models.CharField(max_length=64, null=True, verbose_name='creator')),
+                ('data', models.JSONField(null=True, verbose_name='data')),
+                ('done_at', models.DateTimeField(null=True, verbose_name='completed datetime')),
+                ('handler', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=64), null=True, size=None, verbose_name='handler')),
+                ('initiator', models.CharField(max_length=64, null=True, verbose_name='initiator')),
+                ('initiator_name', models.CharField(max_length=64, null=True, verbose_name='initiator name')),
+                ('obj_name', models.CharField(max_length=64, null=True, verbose_name='obj name')),
+                ('obj_key', models.CharField(max_length=64, null=True, verbose_name='obj key')),
+                ('obj_status', models.CharField(max_length=64, null=True, verbose_name='obj status')),
+                ('candidates', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=64), null=True, size=None, verbose_name='candidates')),
+            ],
+            options={
+                'db_table': 'notice_backlog_batch',
+            },
+        ),
+    ]
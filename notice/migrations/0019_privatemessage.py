@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notice', '0018_backlogbatch'),
+    ]
+
+    # additive only: old code keeps reading and writing the body columns of notice_private_notice,
+    # 0022 backfills notice_private_message and 0025 drops the columns
+    operations = [
+        migrations.CreateModel(
+            name='PrivateMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='create time')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='latest update time')),
+                ('batch', models.CharField(max_length=36, unique=True, verbose_name='batch')),
+                ('creator', models.CharField(max_length=64, null=True, verbose_name='creator')),
+                ('title', models.CharField(max_length=64, null=True, verbose_name='title')),
+                ('content', models.TextField(null=True, verbose_name='content')),
+                ('data', models.JSONField(null=True, verbose_name='data')),
+            ],
+            options={
+                'db_table': 'notice_private_message',
+            },
+        ),
+    ]
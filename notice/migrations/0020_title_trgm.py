@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:50
+
+from django.db import migrations
+
+
+TRGM_INDEXES = (
+    ('notice_store_title_trgm', 'notice_noticestore'),
+    ('notice_private_message_title_trgm', 'notice_private_message'),
+)
+
+
+def pg_trgm_available(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def create_trgm_indexes(apps, schema_editor):
+    # pg_trgm ships with contrib: without it title search still works, unindexed
+    if not pg_trgm_available(schema_editor):
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table in TRGM_INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS {} ON {} USING gin (title gin_trgm_ops)'.format(name, table)
+        )
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    for name, _ in TRGM_INDEXES:
+        schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS {}'.format(name))
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('notice', '0019_privatemessage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes, atomic=False),
+    ]
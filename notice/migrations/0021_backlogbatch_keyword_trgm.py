@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:20
+
+from django.db import migrations
+
+
+TRGM_INDEXES = (
+    ('notice_backlog_obj_key_trgm', 'obj_key'),
+    ('notice_backlog_obj_name_trgm', 'obj_name'),
+)
+
+
+def pg_trgm_available(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def create_trgm_indexes(apps, schema_editor):
+    # keyword search: obj_key/obj_name LIKE by trigram, initiator by notice_backlog_initiator_idx
+    if not pg_trgm_available(schema_editor):
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRGM_INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS {} ON notice_backlog_batch USING gin ({} gin_trgm_ops)'.format(
+                name, column
+            )
+        )
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    for name, _ in TRGM_INDEXES:
+        schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS {}'.format(name))
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('notice', '0020_title_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes, atomic=False),
+    ]
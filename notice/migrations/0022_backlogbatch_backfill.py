@@ -0,0 +1,120 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:40
+
+from django.db import migrations, transaction
+
+
+# receiver rows per transaction, so no lock on notice_backlog / notice_private_notice outlives one chunk
+CHUNK_SIZE = 10000
+
+PAYLOAD_COLUMNS = (
+    'creator', 'data', 'done_at', 'handler', 'initiator', 'initiator_name', 'obj_name', 'obj_key', 'obj_status',
+    'candidates',
+)
+
+BODY_COLUMNS = ('creator', 'title', 'content', 'data')
+
+
+def _id_ranges(connection, table='notice_backlog'):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT min(id), max(id) FROM {}'.format(table))
+        low, high = cursor.fetchone()
+    if low is None:
+        return
+    for start in range(low, high + 1, CHUNK_SIZE):
+        yield start, start + CHUNK_SIZE
+
+
+def backfill_batches(apps, schema_editor):
+    """
+    give every receiver row a batch and one notice_backlog_batch row per batch, keeping the payload of its first
+    receiver row; chunks go up by id and an existing batch row is never overwritten, so it can run again
+    """
+    connection = schema_editor.connection
+    for start, end in _id_ranges(connection):
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE notice_backlog SET batch = gen_random_uuid()::text '
+                'WHERE id >= %s AND id < %s AND batch IS NULL',
+                [start, end]
+            )
+            cursor.execute(
+                'INSERT INTO notice_backlog_batch (created_at, updated_at, batch, {columns}) '
+                'SELECT DISTINCT ON (batch) created_at, updated_at, batch, {columns} FROM notice_backlog b '
+                'WHERE id >= %s AND id < %s '
+                'AND NOT EXISTS (SELECT 1 FROM notice_backlog_batch bb WHERE bb.batch = b.batch) '
+                'ORDER BY batch, id ON CONFLICT (batch) DO NOTHING'.format(columns=', '.join(PAYLOAD_COLUMNS)),
+                [start, end]
+            )
+
+
+def restore_payload(apps, schema_editor):
+    """copy the batch payload back to the receiver rows, for migrating backwards past 0023"""
+    connection = schema_editor.connection
+    for start, end in _id_ranges(connection):
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE notice_backlog b SET {} FROM notice_backlog_batch bb '
+                'WHERE bb.batch = b.batch AND b.id >= %s AND b.id < %s'.format(
+                    ', '.join('{0} = bb.{0}'.format(column) for column in PAYLOAD_COLUMNS)
+                ),
+                [start, end]
+            )
+
+
+def backfill_messages(apps, schema_editor):
+    """
+    give every private notice a batch and one notice_private_message row per batch, keeping the body of its first
+    receiver row; rows sent before batches existed share one batch per distinct body within their chunk
+    """
+    connection = schema_editor.connection
+    for start, end in _id_ranges(connection, 'notice_private_notice'):
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            # MATERIALIZED: gen_random_uuid() must run once per group, not once per joined row
+            cursor.execute(
+                'WITH g AS MATERIALIZED ('
+                '  SELECT creator, title, content, data::text AS data, gen_random_uuid()::text AS batch'
+                '  FROM notice_private_notice WHERE id >= %s AND id < %s AND batch IS NULL'
+                '  GROUP BY creator, title, content, data::text'
+                ') UPDATE notice_private_notice p SET batch = g.batch FROM g'
+                ' WHERE p.id >= %s AND p.id < %s AND p.batch IS NULL'
+                ' AND p.creator IS NOT DISTINCT FROM g.creator AND p.title IS NOT DISTINCT FROM g.title'
+                ' AND p.content IS NOT DISTINCT FROM g.content AND p.data::text IS NOT DISTINCT FROM g.data',
+                [start, end, start, end]
+            )
+            cursor.execute(
+                'INSERT INTO notice_private_message (created_at, updated_at, batch, {columns}) '
+                'SELECT DISTINCT ON (batch) created_at, updated_at, batch, {columns} FROM notice_private_notice p '
+                'WHERE id >= %s AND id < %s '
+                'AND NOT EXISTS (SELECT 1 FROM notice_private_message m WHERE m.batch = p.batch) '
+                'ORDER BY batch, id ON CONFLICT (batch) DO NOTHING'.format(columns=', '.join(BODY_COLUMNS)),
+                [start, end]
+            )
+
+
+def restore_body(apps, schema_editor):
+    """copy the message body back to the receiver rows, for migrating backwards past 0025"""
+    connection = schema_editor.connection
+    for start, end in _id_ranges(connection, 'notice_private_notice'):
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE notice_private_notice p SET {} FROM notice_private_message m '
+                'WHERE m.batch = p.batch AND p.id >= %s AND p.id < %s'.format(
+                    ', '.join('{0} = m.{0}'.format(column) for column in BODY_COLUMNS)
+                ),
+                [start, end]
+            )
+
+
+class Migration(migrations.Migration):
+    # one transaction per chunk instead of one for the whole table
+    atomic = False
+
+    dependencies = [
+        ('notice', '0021_backlogbatch_keyword_trgm'),
+    ]
+
+    operations = [
+        # the payload and body columns stay until 0023 and 0025, nothing to undo
+        migrations.RunPython(backfill_batches, migrations.RunPython.noop, atomic=False),
+        migrations.RunPython(backfill_messages, migrations.RunPython.noop, atomic=False),
+    ]
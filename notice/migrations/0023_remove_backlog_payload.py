@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:45
+
+from importlib import import_module
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+backfill = import_module('notice.migrations.0022_backlogbatch_backfill')
+
+FK_NAME = 'notice_backlog_batch_fk_notice_backlog_batch'
+
+
+class Migration(migrations.Migration):
+    # run once the code reading notice_backlog_batch is deployed, see 0018
+    atomic = False
+
+    dependencies = [
+        ('notice', '0022_backlogbatch_backfill'),
+    ]
+
+    operations = [
+        # rows the old code wrote after 0022
+        migrations.RunPython(backfill.backfill_batches, backfill.restore_payload, atomic=False),
+        # the names move to notice_backlog_batch
+        RemoveIndexConcurrently(
+            model_name='backlog',
+            name='notice_backlog_initiator_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='backlog',
+            name='notice_backlog_candidates_gin',
+        ),
+        AddIndexConcurrently(
+            model_name='backlogbatch',
+            index=models.Index(fields=['initiator'], name='notice_backlog_initiator_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='backlogbatch',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['candidates'], name='notice_backlog_candidates_gin'),
+        ),
+        # catalog only changes: each takes the table lock for an instant
+        *[migrations.RemoveField(model_name='backlog', name=column) for column in backfill.PAYLOAD_COLUMNS],
+        # NOT VALID checks new rows only, VALIDATE scans the table without blocking writes
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='backlog',
+                    name='batch',
+                    field=models.ForeignKey(db_column='batch', db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='backlogs', to='notice.backlogbatch', to_field='batch', verbose_name='batch'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql=(
+                        'ALTER TABLE notice_backlog ADD CONSTRAINT {} FOREIGN KEY (batch) '
+                        'REFERENCES notice_backlog_batch (batch) DEFERRABLE INITIALLY DEFERRED NOT VALID'
+                    ).format(FK_NAME),
+                    reverse_sql='ALTER TABLE notice_backlog DROP CONSTRAINT {}'.format(FK_NAME),
+                ),
+                migrations.RunSQL(
+                    sql='ALTER TABLE notice_backlog VALIDATE CONSTRAINT {}'.format(FK_NAME),
+                    reverse_sql=migrations.RunSQL.noop,
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:10
+
+from django.db import migrations
+
+
+CHECK_NAME = 'notice_backlog_batch_not_null'
+
+
+class Migration(migrations.Migration):
+    # 0023 made backlog.batch NOT NULL in the state only: one statement per lock, none of them scans under
+    # ACCESS EXCLUSIVE, SET NOT NULL trusts the validated check instead of scanning the table
+    atomic = False
+
+    dependencies = [
+        ('notice', '0023_remove_backlog_payload'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='ALTER TABLE notice_backlog ADD CONSTRAINT {} CHECK (batch IS NOT NULL) NOT VALID'.format(CHECK_NAME),
+            reverse_sql='ALTER TABLE notice_backlog DROP CONSTRAINT IF EXISTS {}'.format(CHECK_NAME),
+        ),
+        migrations.RunSQL(
+            sql='ALTER TABLE notice_backlog VALIDATE CONSTRAINT {}'.format(CHECK_NAME),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            sql='ALTER TABLE notice_backlog ALTER COLUMN batch SET NOT NULL',
+            reverse_sql='ALTER TABLE notice_backlog ALTER COLUMN batch DROP NOT NULL',
+        ),
+        migrations.RunSQL(
+            sql='ALTER TABLE notice_backlog DROP CONSTRAINT {}'.format(CHECK_NAME),
+            reverse_sql='ALTER TABLE notice_backlog ADD CONSTRAINT {} CHECK (batch IS NOT NULL) NOT VALID'.format(
+                CHECK_NAME
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:40
+
+from importlib import import_module
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+backfill = import_module('notice.migrations.0022_backlogbatch_backfill')
+
+FK_NAME = 'notice_private_notice_batch_fk_notice_private_message'
+CHECK_NAME = 'notice_private_notice_batch_not_null'
+
+
+class Migration(migrations.Migration):
+    # run once the code reading notice_private_message is deployed, see 0019
+    atomic = False
+
+    dependencies = [
+        ('notice', '0024_backlog_batch_not_null'),
+    ]
+
+    operations = [
+        # rows the old code wrote after 0022
+        migrations.RunPython(backfill.backfill_messages, backfill.restore_body, atomic=False),
+        # catalog only changes: each takes the table lock for an instant
+        *[migrations.RemoveField(model_name='privatenotice', name=column) for column in backfill.BODY_COLUMNS],
+        # NOT VALID checks new rows only, VALIDATE scans the table without blocking writes,
+        # SET NOT NULL trusts the validated check instead of scanning under ACCESS EXCLUSIVE
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='privatenotice',
+                    name='batch',
+                    field=models.ForeignKey(db_column='batch', db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='notice.privatemessage', to_field='batch', verbose_name='message'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql=(
+                        'ALTER TABLE notice_private_notice ADD CONSTRAINT {} FOREIGN KEY (batch) '
+                        'REFERENCES notice_private_message (batch) DEFERRABLE INITIALLY DEFERRED NOT VALID'
+                    ).format(FK_NAME),
+                    reverse_sql='ALTER TABLE notice_private_notice DROP CONSTRAINT {}'.format(FK_NAME),
+                ),
+                migrations.RunSQL(
+                    sql='ALTER TABLE notice_private_notice VALIDATE CONSTRAINT {}'.format(FK_NAME),
+                    reverse_sql=migrations.RunSQL.noop,
+                ),
+                migrations.RunSQL(
+                    sql='ALTER TABLE notice_private_notice ADD CONSTRAINT {} CHECK (batch IS NOT NULL) NOT VALID'.format(
+                        CHECK_NAME
+                    ),
+                    reverse_sql='ALTER TABLE notice_private_notice DROP CONSTRAINT IF EXISTS {}'.format(CHECK_NAME),
+                ),
+                migrations.RunSQL(
+                    sql='ALTER TABLE notice_private_notice VALIDATE CONSTRAINT {}'.format(CHECK_NAME),
+                    reverse_sql=migrations.RunSQL.noop,
+                ),
+                migrations.RunSQL(
+                    sql='ALTER TABLE notice_private_notice ALTER COLUMN batch SET NOT NULL',
+                    reverse_sql='ALTER TABLE notice_private_notice ALTER COLUMN batch DROP NOT NULL',
+                ),
+                migrations.RunSQL(
+                    sql='ALTER TABLE notice_private_notice DROP CONSTRAINT {}'.format(CHECK_NAME),
+                    reverse_sql=(
+                        'ALTER TABLE notice_private_notice ADD CONSTRAINT {} CHECK (batch IS NOT NULL) NOT VALID'
+                    ).format(CHECK_NAME),
+                ),
+            ],
+        ),
+    ]
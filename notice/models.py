@@ -16,8 +16,9 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 
-from notice.settings import NOTICE_DATETIME_FORMAT
+from notice.settings import NOTICE_DATETIME_FORMAT, NOTICE_PUBLISH_SCHEDULER
 
 
 class BaseTimeModel(models.Model):
@@ -69,6 +70,7 @@ class NoticeStore(BaseTimeModel, IsDeletedModel):
     is_draft = models.BooleanField(default=True, verbose_name=_('draft tag'))
     creator_id = models.IntegerField(verbose_name=_('creator id'))
     publish_at = models.DateTimeField(null=True, verbose_name=_('publish time'))
+    is_published = models.BooleanField(default=False, verbose_name=_('published tag'))
 
     class StatusEnum(Enum):
         DRAFT = 'draft'
@@ -81,17 +83,40 @@ class NoticeStore(BaseTimeModel, IsDeletedModel):
         StatusEnum.DONE: _('Done'),
     }
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=['receiver_type_ids'], name='notice_store_receiver_gin'),
+            models.Index(
+                fields=['notice_type', 'publish_at', 'id'],
+                condition=models.Q(is_draft=False, is_deleted=False),
+                name='notice_store_visible_idx',
+            ),
+            models.Index(
+                fields=['notice_type', 'id'],
+                condition=models.Q(is_published=True, is_deleted=False),
+                name='notice_store_published_idx',
+            ),
+        ]
+
+    @property
+    def is_visible(self):
+        if self.is_draft:
+            return False
+        if NOTICE_PUBLISH_SCHEDULER:
+            return self.is_published
+        return self.publish_at <= timezone.now()
+
     @property
     def status(self):
         if self.is_draft:
             return self.StatusEnum.DRAFT
-        if self.publish_at > timezone.now():
+        if not self.is_visible:
             return self.StatusEnum.QUEUE
         return self.StatusEnum.DONE
 
     @property
     def published_at(self):
-        if not self.is_draft and self.publish_at <= timezone.now():
+        if self.is_visible:
             return self.publish_at.strftime(NOTICE_DATETIME_FORMAT)
         return None
 
@@ -103,15 +128,25 @@ class ReceiverTag(BaseTimeModel, IsDeletedModel):
 
     class Meta:
         db_table = 'notice_receiver_tag'
+        constraints = [
+            models.UniqueConstraint(fields=['receiver', 'noticestore'], name='notice_receiver_tag_unique'),
+        ]
 
 
-class Backlog(BaseTimeModel):
+class ReceiverWatermark(BaseTimeModel):
+    """every notice published at or before `read_until` is read by `receiver`"""
+    receiver = models.CharField(unique=True, max_length=64, verbose_name=_('receiver'))
+    read_until = models.DateTimeField(verbose_name=_('read until'))
+
+    class Meta:
+        db_table = 'notice_receiver_watermark'
+
+
+class BacklogBatch(BaseTimeModel):
+    """payload shared by every receiver of one backlog"""
+    batch = models.CharField(unique=True, max_length=36, verbose_name=_('batch'))
     creator = models.CharField(verbose_name=_('creator'), max_length=64, null=True)
-    receiver = models.CharField(verbose_name=_('receiver'), max_length=64)
-    is_read = models.BooleanField(default=False, verbose_name=_('read status'))
-    read_at = models.DateTimeField(null=True, verbose_name=_('read time'))
     data = JSONField(verbose_name=_('data'), null=True)
-    is_done = models.BooleanField(default=False, verbose_name=_('completed status'))
     done_at = models.DateTimeField(null=True, verbose_name=_('completed datetime'))
     handler = ArrayField(models.CharField(max_length=64), null=True, verbose_name=_('handler'))
     initiator = models.CharField(null=True, max_length=64, verbose_name=_('initiator'))
@@ -119,21 +154,63 @@ class Backlog(BaseTimeModel):
     obj_name = models.CharField(null=True, max_length=64, verbose_name=_('obj name'))
     obj_key = models.CharField(null=True, max_length=64, verbose_name=_('obj key'))
     obj_status = models.CharField(null=True, max_length=64, verbose_name=_('obj status'))
-    batch = models.CharField(null=True, max_length=36, verbose_name=_('batch'))
     candidates = ArrayField(models.CharField(max_length=64),  null=True, verbose_name=_('candidates'))
 
+    class Meta:
+        db_table = 'notice_backlog_batch'
+        indexes = [
+            models.Index(fields=['initiator'], name='notice_backlog_initiator_idx'),
+            GinIndex(fields=['candidates'], name='notice_backlog_candidates_gin'),
+        ]
+
+
+class Backlog(BaseTimeModel):
+    """one receiver of a BacklogBatch"""
+    batch = models.ForeignKey(
+        BacklogBatch, to_field='batch', db_column='batch', db_index=False, on_delete=models.CASCADE,
+        related_name='backlogs', verbose_name=_('batch')
+    )
+    receiver = models.CharField(verbose_name=_('receiver'), max_length=64)
+    is_read = models.BooleanField(default=False, verbose_name=_('read status'))
+    read_at = models.DateTimeField(null=True, verbose_name=_('read time'))
+    is_done = models.BooleanField(default=False, verbose_name=_('completed status'))
+
     class Meta:
         db_table = 'notice_backlog'
+        indexes = [
+            models.Index(fields=['receiver', 'is_done', '-id'], name='notice_backlog_receiver_idx'),
+            models.Index(fields=['batch'], name='notice_backlog_batch_idx'),
+        ]
 
 
-class PrivateNotice(BaseTimeModel):
+class PrivateMessage(BaseTimeModel):
+    """body shared by every receiver of one private notice send"""
+    batch = models.CharField(unique=True, max_length=36, verbose_name=_('batch'))
     creator = models.CharField(verbose_name=_('creator'), max_length=64, null=True)
-    receiver = models.CharField(verbose_name=_('receiver'), max_length=64)
-    content = models.TextField(null=True, verbose_name=_('content'))
     title = models.CharField(null=True, max_length=64, verbose_name=_('title'))
+    content = models.TextField(null=True, verbose_name=_('content'))
     data = JSONField(null=True, verbose_name=_('data'))
+
+    class Meta:
+        db_table = 'notice_private_message'
+
+
+class PrivateNotice(BaseTimeModel):
+    """delivery of a PrivateMessage to one receiver"""
+    batch = models.ForeignKey(
+        PrivateMessage, to_field='batch', db_column='batch', db_index=False, on_delete=models.CASCADE,
+        related_name='deliveries', verbose_name=_('message')
+    )
+    receiver = models.CharField(verbose_name=_('receiver'), max_length=64)
     is_read = models.BooleanField(default=False, verbose_name=_('read status'))
     read_at = models.DateTimeField(null=True, verbose_name=_('read time'))
 
     class Meta:
         db_table = 'notice_private_notice'
+        indexes = [
+            models.Index(fields=['receiver', '-id'], name='notice_private_receiver_idx'),
+            models.Index(fields=['batch'], name='notice_private_batch_idx'),
+            models.Index(
+                fields=['receiver', '-id'], condition=models.Q(is_read=False), name='notice_private_unread_idx'
+            ),
+        ]
@@ -0,0 +1,22 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : materialize NoticeStore.is_published for timing notices
+@Author  : Rey
+@Time    : 2026-10-18 13:30:00
+"""
+from django.utils import timezone
+
+from notice.models import NoticeStore
+from notice.signals import notice_published
+
+
+def publish_due_notices(now=None) -> list:
+    """flip is_published on every timing notice whose publish_at has passed, return their ids"""
+    now = now or timezone.now()
+    ids = list(NoticeStore.objects.filter(
+        is_draft=False, is_published=False, publish_at__lte=now
+    ).values_list('id', flat=True))
+    if ids:
+        NoticeStore.objects.filter(id__in=ids, is_published=False).update(is_published=True, updated_at=now)
+        notice_published.send(sender=NoticeStore, ids=ids)
+    return ids
@@ -0,0 +1,97 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : buffered read receipt writer
+@Author  : Rey
+@Time    : 2026-10-18 12:20:00
+"""
+import atexit
+import logging
+import threading
+from collections import deque
+
+from django.db import DatabaseError, close_old_connections, connection
+from django.utils import timezone
+
+from notice.events import publish_event
+from notice.models import ReceiverTag
+from notice.settings import NOTICE_RECEIPT_FLUSH_INTERVAL, NOTICE_RECEIPT_FLUSH_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReceiptBuffer:
+    """per-process queue of ReceiverTag rows, written in batches by a background thread"""
+    def __init__(self, flush_size: int, flush_interval: float) -> None:
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def put(self, receiver: str, noticestore_id: int, read_at=None):
+        self._pending.append(ReceiverTag(
+            receiver=receiver,
+            noticestore_id=noticestore_id,
+            read_at=read_at or timezone.now()
+        ))
+        if self._thread is None:
+            self.start()
+        if len(self._pending) >= self.flush_size:
+            self._wakeup.set()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='notice-receipt-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self, timeout=None):
+        """flush what is left and wait for the writer thread"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def flush(self) -> int:
+        """write all pending receipts, return how many were sent to the database"""
+        total = 0
+        while self._pending:
+            batch = []
+            try:
+                while len(batch) < self.flush_size:
+                    batch.append(self._pending.popleft())
+            except IndexError:
+                pass
+            if batch:
+                try:
+                    ReceiverTag.objects.bulk_create(batch, ignore_conflicts=True)
+                except DatabaseError:
+                    # back to the head of the queue, the next flush retries them in order
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                publish_event(*{tag.receiver for tag in batch})
+                total += len(batch)
+        return total
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._flush_safely()
+        self._flush_safely()
+        connection.close()
+
+    def _flush_safely(self):
+        close_old_connections()
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.exception('notice: failed to write buffered read receipts')
+
+
+receipt_buffer = ReceiptBuffer(NOTICE_RECEIPT_FLUSH_SIZE, NOTICE_RECEIPT_FLUSH_INTERVAL)
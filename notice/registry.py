@@ -0,0 +1,75 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : process-wide notice type / receiver type registry
+@Author  : Rey
+@Time    : 2026-10-18 12:40:00
+"""
+import threading
+
+from django.apps import apps
+from django.db import transaction
+
+
+class TypeRegistry:
+    """
+    cache of NoticeType and ReceiverType rows shared by the whole process
+
+    loaded on first use and checked against a version token in NOTICE_CACHE_ALIAS, so a save in one
+    worker reaches the others; post_save/post_delete on both models bump the token,
+    updates done with queryset.update() must call invalidate() themselves
+    """
+    models = ('NoticeType', 'ReceiverType')
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._generation = 0
+        self._version = None
+
+    def rows(self, model_name: str) -> list:
+        """[{'id': 1, 'name': 'system', 'desc': 'SYSTEM'}, ...] ordered by id"""
+        from notice.cache import registry_version
+
+        version = registry_version()
+        if version != self._version:
+            with self._lock:
+                self._generation += 1
+                self._rows = {}
+                self._version = version
+        rows = self._rows.get(model_name)
+        if rows is None:
+            generation = self._generation
+            rows = list(
+                apps.get_model('notice', model_name).objects.all().order_by('id').values('id', 'name', 'desc')
+            )
+            with self._lock:
+                # an invalidation while loading means these rows may already be stale
+                if generation == self._generation:
+                    self._rows[model_name] = rows
+        return rows
+
+    def names(self, model_name: str) -> dict:
+        return {row['name']: row['id'] for row in self.rows(model_name)}
+
+    def ids(self, model_name: str) -> set:
+        return {row['id'] for row in self.rows(model_name)}
+
+    def warm(self):
+        for model_name in self.models:
+            self.rows(model_name)
+
+    def invalidate(self, *args, **kwargs):
+        from notice.cache import invalidate_registry
+
+        invalidate_registry()
+        with self._lock:
+            self._generation += 1
+            self._rows = {}
+
+    def on_change(self, sender, **kwargs):
+        """signal receiver: drop now, and again once the writing transaction commits"""
+        self.invalidate()
+        transaction.on_commit(self.invalidate)
+
+
+type_registry = TypeRegistry()
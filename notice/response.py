@@ -55,6 +55,10 @@ class ValidationFailedDetailEnum(Enum):
     PUBLISH_TIME = _('Invalid Publish Time')
     PAGE = _('Invalid Page')
     SIZE = _('Invalid Size')
+    CURSOR = _('Invalid Cursor')
+    READ_SCOPE = _('Invalid Read Scope')
+    EXPORT_FORMAT = _('Invalid Export Format')
+    SEARCH = _('Invalid Search Mode')
 
     OUTDATE = _('Cant Set Time Which Is Out Of Date')
     CHANGE_NOT_DRAFT = _('Cant Change Notice Which Is Not Draft')
@@ -14,6 +14,22 @@ from notice.helpers import BaseGetAllowedTypes
 NOTICE_CREATOR_MODEL = getattr(settings, 'NOTICE_CREATOR_MODEL', settings.AUTH_USER_MODEL)
 NOTICE_RECEIVER_MODEL = getattr(settings, 'NOTICE_RECEIVER_MODEL', settings.AUTH_USER_MODEL)
 NOTICE_DATETIME_FORMAT = getattr(settings, 'NOTICE_DATETIME_FORMAT', '%Y-%m-%d %H:%M:%S')
+NOTICE_RECEIPT_BUFFER = getattr(settings, 'NOTICE_RECEIPT_BUFFER', False)
+NOTICE_RECEIPT_FLUSH_SIZE = getattr(settings, 'NOTICE_RECEIPT_FLUSH_SIZE', 500)
+NOTICE_RECEIPT_FLUSH_INTERVAL = getattr(settings, 'NOTICE_RECEIPT_FLUSH_INTERVAL', 1)
+NOTICE_CACHE_ALIAS = getattr(settings, 'NOTICE_CACHE_ALIAS', 'default')
+NOTICE_JUDGE_CACHE_TIMEOUT = getattr(settings, 'NOTICE_JUDGE_CACHE_TIMEOUT', 0)
+NOTICE_PAGE_CACHE_TIMEOUT = getattr(settings, 'NOTICE_PAGE_CACHE_TIMEOUT', 0)
+NOTICE_HANDLER_CACHE_TIMEOUT = getattr(settings, 'NOTICE_HANDLER_CACHE_TIMEOUT', 0)
+NOTICE_UNREAD_COUNT_LIMIT = getattr(settings, 'NOTICE_UNREAD_COUNT_LIMIT', None)
+NOTICE_PUBLISH_SCHEDULER = getattr(settings, 'NOTICE_PUBLISH_SCHEDULER', False)
+NOTICE_EVENT_BACKEND = getattr(settings, 'NOTICE_EVENT_BACKEND', 'local')
+NOTICE_STREAM_HEARTBEAT = getattr(settings, 'NOTICE_STREAM_HEARTBEAT', 15)
+NOTICE_STREAM_RETRY = getattr(settings, 'NOTICE_STREAM_RETRY', 3000)
+NOTICE_STREAM_BROADCAST_JITTER = getattr(settings, 'NOTICE_STREAM_BROADCAST_JITTER', 1)
+NOTICE_EXPORT_CHUNK_SIZE = getattr(settings, 'NOTICE_EXPORT_CHUNK_SIZE', 2000)
+NOTICE_PRIVATE_BATCH_SIZE = getattr(settings, 'NOTICE_PRIVATE_BATCH_SIZE', 1000)
+NOTICE_PRIVATE_COPY_THRESHOLD = getattr(settings, 'NOTICE_PRIVATE_COPY_THRESHOLD', 0)
 
 def get_notice_allowed_types_cls():
     cls_conf = getattr(settings, 'NOTICE_ALLOWED_TYPED_CLASS')
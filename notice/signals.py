@@ -0,0 +1,11 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : signals
+@Author  : Rey
+@Time    : 2026-10-18 13:30:00
+"""
+from django.dispatch import Signal
+
+
+# sent by publish_due_notices with ids=[...] of the notices that just became visible
+notice_published = Signal()
@@ -5,17 +5,33 @@
 @Time    : 2022-04-04 12:51:37
 @Run     : python manage.py test notice -v 3 --keepdb
 """
+import asyncio
 from datetime import timedelta
+from io import StringIO
 import json
+from unittest import mock
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection
 from django.test import TestCase
 from django.urls import reverse
 from django.utils.timezone import now as timezone_now
 
+from notice.cache import invalidate_judge_cache, invalidate_notice_pages, judge_allowed_types
+from notice.events import BROADCAST, LocalBroker, publish_event
 from notice.forms import NoticeForm
-from notice.models import NoticeStore, NoticeType, ReceiverType, ReceiverTag
-from notice.settings import NOTICE_DATETIME_FORMAT
+from notice.helpers import trigram_installed
+from notice.models import NoticeStore, NoticeType, ReceiverType, ReceiverTag, ReceiverWatermark
+from notice.publisher import publish_due_notices
+from notice.receipts import ReceiptBuffer
+from notice.registry import TypeRegistry, type_registry
+from notice.response import ValidationFailedDetailEnum
+from notice.settings import NOTICE_ALLOWED_TYPED_CLASS, NOTICE_DATETIME_FORMAT
+from notice.signals import notice_published
+from notice.views.client import get_page_notice
+from notice.views.stream import event_stream
 
 
 class AdminListALLNoticeTypeCase(TestCase):
@@ -55,6 +71,36 @@ class AdminListAllReceiverTypeCase(TestCase):
         self.assertListEqual(resp_json, [])
 
 
+class TypeRegistryCase(TestCase):
+    """test the process-wide type registry"""
+    fixtures = ('notice_types.json', 'receiver_types.json')
+
+    def test_cached(self):
+        type_registry.invalidate()
+        with self.assertNumQueries(2):
+            type_registry.warm()
+        with self.assertNumQueries(0):
+            self.assertDictEqual(type_registry.names('NoticeType'), {'system': 1, 'private': 3})
+            self.assertSetEqual(type_registry.ids('ReceiverType'), {1, 3})
+            self.client.get(reverse('admin-notice-types'))
+
+    def test_invalidate_on_save(self):
+        type_registry.warm()
+        notice_type = NoticeType.objects.create(name='extra', desc='EXTRA')
+        self.assertEqual(type_registry.names('NoticeType')['extra'], notice_type.id)
+        notice_type.delete()
+        self.assertNotIn('extra', type_registry.names('NoticeType'))
+
+    def test_invalidate_other_process(self):
+        # a second registry stands in for another worker sharing the cache
+        other = TypeRegistry()
+        other.warm()
+        notice_type = NoticeType.objects.create(name='extra', desc='EXTRA')
+        self.assertEqual(other.names('NoticeType')['extra'], notice_type.id)
+        with self.assertNumQueries(0):
+            other.ids('NoticeType')
+
+
 class AdminListNoticeCase(TestCase):
     """test get notice"""
     fixtures = ('notice_types.json', 'receiver_types.json', 'notice.json')
@@ -427,6 +473,63 @@ class ClientListNotice(TestCase):
         self.assertEqual(items[3]['id'], 4)
         self.assertFalse(items[3]['is_read'])
 
+    def test_cursor(self):
+        self.client.login(username='testuser', password='123456')
+        resp = self.client.get(reverse('client-list-notice'), {'cursor': '', 'size': 2})
+        self.assertEqual(resp.status_code, 200)
+        resp_json = resp.json()
+        self.assertNotIn('total', resp_json)
+        self.assertListEqual([i['id'] for i in resp_json['items']], [15, 14])
+        self.assertTrue(resp_json['items'][0]['is_read'])
+        self.assertFalse(resp_json['items'][1]['is_read'])
+        self.assertIsNotNone(resp_json['next_cursor'])
+
+        resp = self.client.get(reverse('client-list-notice'), {'cursor': resp_json['next_cursor'], 'size': 2})
+        resp_json = resp.json()
+        self.assertListEqual([i['id'] for i in resp_json['items']], [5, 4])
+        self.assertIsNone(resp_json['next_cursor'])
+
+    def test_invalid_cursor(self):
+        self.client.login(username='testuser', password='123456')
+        resp = self.client.get(reverse('client-list-notice'), {'cursor': 'abc$'})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_search(self):
+        self.client.login(username='testuser', password='123456')
+        resp = self.client.get(reverse('client-list-notice'), {'title': 'TITLE1'})
+        self.assertEqual(resp.json()['total'], 0)
+        resp = self.client.get(reverse('client-list-notice'), {'title': 'TITLE1', 'search': 'icontains'})
+        self.assertListEqual([i['id'] for i in resp.json()['items']], [15, 14])
+        resp = self.client.get(reverse('client-list-notice'), {'title': 'TITLE1', 'search': 'icontains', 'cursor': ''})
+        self.assertListEqual([i['id'] for i in resp.json()['items']], [15, 14])
+
+        self.assertEqual(self.client.get(reverse('client-list-notice'), {'search': 'regex'}).status_code, 400)
+        resp = self.client.get(reverse('client-list-notice'), {'search': 'similar', 'cursor': ''})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_similar_unavailable(self):
+        # no `%` operator or similarity() without pg_trgm: a 400, not a 500
+        self.client.login(username='testuser', password='123456')
+        with mock.patch.dict('notice.helpers._trigram_installed', {'default': False}):
+            resp = self.client.get(reverse('client-list-notice'), {'title': 'title14', 'search': 'similar'})
+            self.assertEqual(resp.status_code, 400)
+            self.assertEqual(resp.json()['detail'], str(ValidationFailedDetailEnum.SEARCH.value))
+            resp = self.client.get(reverse('async-client-list-notice'), {'title': 'title14', 'search': 'similar'})
+            self.assertEqual(resp.status_code, 400)
+            resp = self.client.get(reverse('client-list-notice'), {'title': 'title14', 'search': 'icontains'})
+            self.assertEqual(resp.status_code, 200)
+
+    def test_similar(self):
+        if not trigram_installed():
+            self.skipTest('pg_trgm is not installed')
+        self.client.login(username='testuser', password='123456')
+        resp = self.client.get(reverse('client-list-notice'), {'title': 'title14', 'search': 'similar'})
+        self.assertEqual(resp.json()['items'][0]['id'], 14)
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = NoticeStore.objects.filter(title__icontains='title14').explain()
+        self.assertIn('notice_store_title_trgm', plan)
+
 
 class ClientRetreiveNotice(TestCase):
     fixtures = ('notice_types.json', 'receiver_types.json', 'notice.json', 'notice_tag.json')
@@ -465,3 +568,366 @@ class ClientRetreiveNotice(TestCase):
         resp = self.client_request(5)
         self.assertEqual(resp.status_code, 200)
         self.assertTrue(ReceiverTag.objects.filter(noticestore_id=5, receiver='1').exists())
+
+    def test_read_twice(self):
+        self.assertEqual(self.client_request(4).status_code, 200)
+        self.assertEqual(self.client_request(4).status_code, 200)
+        self.assertEqual(ReceiverTag.objects.filter(noticestore_id=4, receiver='1').count(), 1)
+
+    def test_unique_tag(self):
+        with self.assertRaises(IntegrityError):
+            ReceiverTag.objects.create(noticestore_id=5, receiver='1', read_at=timezone_now())
+
+
+class ClientNoticeStatus(TestCase):
+    fixtures = ('notice_types.json', 'receiver_types.json', 'notice.json', 'notice_tag.json')
+
+    def setUp(self):
+        User.objects.create_user('testuser', 'user@test.com', '123456', pk=1)
+        self.client.login(username='testuser', password='123456')
+
+    def test_unread(self):
+        resp = self.client.get(reverse('client-notice-status'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertDictEqual(resp.json(), {'is_unread': True, 'unread': 2})
+
+    def test_invisible_tag(self):
+        # a tag of a notice the receiver cannot see must not hide an unread one
+        ReceiverTag.objects.create(noticestore_id=9, receiver='1', read_at=timezone_now())
+        ReceiverTag.objects.create(noticestore_id=4, receiver='1', read_at=timezone_now())
+        resp = self.client.get(reverse('client-notice-status'))
+        self.assertDictEqual(resp.json(), {'is_unread': True, 'unread': 1})
+
+    def test_all_read(self):
+        ReceiverTag.objects.bulk_create([
+            ReceiverTag(noticestore_id=pk, receiver='1', read_at=timezone_now()) for pk in (4, 14)
+        ])
+        resp = self.client.get(reverse('client-notice-status'))
+        self.assertDictEqual(resp.json(), {'is_unread': False, 'unread': 0})
+
+
+class ClientReadAllNotice(TestCase):
+    fixtures = ('notice_types.json', 'receiver_types.json', 'notice.json', 'notice_tag.json')
+
+    def setUp(self):
+        User.objects.create_user('testuser', 'user@test.com', '123456', pk=1)
+        self.client.login(username='testuser', password='123456')
+
+    def test_read_all(self):
+        resp = self.client.put(reverse('client-read-notice'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(ReceiverWatermark.objects.filter(receiver='1').exists())
+        self.assertFalse(ReceiverTag.objects.filter(receiver='1').exists())
+
+        self.assertDictEqual(self.client.get(reverse('client-notice-status')).json(), {'is_unread': False, 'unread': 0})
+        items = self.client.get(reverse('client-list-notice')).json()['items']
+        self.assertEqual(len(items), 4)
+        self.assertTrue(all(item['is_read'] for item in items))
+
+        # below the watermark: no tag is written
+        self.client.get(reverse('client-retrieve-notice', kwargs={'pk': 4}))
+        self.assertFalse(ReceiverTag.objects.filter(receiver='1').exists())
+
+    def test_published_after(self):
+        self.client.put(reverse('client-read-notice'))
+        notice = NoticeStore.objects.create(
+            title='new', notice_type_id=1, receiver_type_ids=[1], is_draft=False, creator_id=1, publish_at=timezone_now()
+        )
+        self.assertDictEqual(self.client.get(reverse('client-notice-status')).json(), {'is_unread': True, 'unread': 1})
+        items = self.client.get(reverse('client-list-notice')).json()['items']
+        self.assertEqual(items[0]['id'], notice.id)
+        self.assertFalse(items[0]['is_read'])
+
+        self.client.get(reverse('client-retrieve-notice', kwargs={'pk': notice.id}))
+        self.assertTrue(ReceiverTag.objects.filter(receiver='1', noticestore_id=notice.id).exists())
+        self.assertDictEqual(self.client.get(reverse('client-notice-status')).json(), {'is_unread': False, 'unread': 0})
+
+
+class PublishSchedulerCase(TestCase):
+    fixtures = ('notice_types.json', 'receiver_types.json', 'notice.json', 'notice_tag.json')
+
+    def setUp(self):
+        User.objects.create_user('testuser', 'user@test.com', '123456', pk=1)
+        self.client.login(username='testuser', password='123456')
+        for target in ('notice.views.client.NOTICE_PUBLISH_SCHEDULER', 'notice.models.NOTICE_PUBLISH_SCHEDULER'):
+            patcher = mock.patch(target, True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_publish(self):
+        self.assertEqual(self.client.get(reverse('client-list-notice')).json()['total'], 0)
+
+        published = []
+        receiver = lambda sender, ids, **kwargs: published.extend(ids)
+        notice_published.connect(receiver)
+        self.addCleanup(notice_published.disconnect, receiver)
+        call_command('publish_notices', stdout=StringIO())
+
+        self.assertTrue({4, 5, 14, 15} <= set(published))
+        self.assertNotIn(1, published)
+        self.assertNotIn(3, published)
+        self.assertEqual(NoticeStore.objects.get(pk=3).status, NoticeStore.StatusEnum.QUEUE)
+        self.assertEqual(NoticeStore.objects.get(pk=4).status, NoticeStore.StatusEnum.DONE)
+
+        resp_json = self.client.get(reverse('client-list-notice')).json()
+        self.assertListEqual([item['id'] for item in resp_json['items']], [15, 14, 5, 4])
+        self.assertListEqual(publish_due_notices(), [])
+
+    def test_read_all_before_flip(self):
+        publish_due_notices()
+        due = NoticeStore.objects.create(
+            title='due', notice_type_id=1, receiver_type_ids=[1], is_draft=False, is_published=False, creator_id=1,
+            publish_at=timezone_now() - timedelta(seconds=1)
+        )
+        published = NoticeStore.objects.create(
+            title='now', notice_type_id=1, receiver_type_ids=[1], is_draft=False, is_published=True, creator_id=1,
+            publish_at=timezone_now()
+        )
+        self.client.put(reverse('client-read-notice'))
+        self.assertLess(ReceiverWatermark.objects.get(receiver='1').read_until, due.publish_at)
+        self.assertDictEqual(self.client.get(reverse('client-notice-status')).json(), {'is_unread': False, 'unread': 0})
+
+        # flipped after the read-all: still unread
+        self.assertListEqual(publish_due_notices(), [due.id])
+        self.assertDictEqual(self.client.get(reverse('client-notice-status')).json(), {'is_unread': True, 'unread': 1})
+        items = {item['id']: item['is_read'] for item in self.client.get(reverse('client-list-notice')).json()['items']}
+        self.assertFalse(items[due.id])
+        self.assertTrue(items[published.id])
+
+    def test_publish_timing(self):
+        NoticeStore.objects.filter(pk=3).update(publish_at=timezone_now() - timedelta(seconds=1))
+        self.assertEqual(NoticeStore.objects.get(pk=3).status, NoticeStore.StatusEnum.QUEUE)
+        self.assertIn(3, publish_due_notices())
+        self.assertEqual(NoticeStore.objects.get(pk=3).status, NoticeStore.StatusEnum.DONE)
+
+
+class JudgeCacheCase(TestCase):
+    fixtures = ('notice_types.json', 'receiver_types.json')
+
+    def setUp(self):
+        patcher = mock.patch('notice.cache.NOTICE_JUDGE_CACHE_TIMEOUT', 60)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        invalidate_judge_cache()
+
+    def test_cached(self):
+        with mock.patch.object(NOTICE_ALLOWED_TYPED_CLASS, 'judge', autospec=True, return_value=([1], [1])) as judge:
+            self.assertEqual(judge_allowed_types('1'), ([1], [1]))
+            self.assertEqual(judge_allowed_types('1'), ([1], [1]))
+            self.assertEqual(judge.call_count, 1)
+            judge_allowed_types('2')
+            judge_allowed_types('3')
+            self.assertEqual(judge.call_count, 3)
+
+    def test_invalidate(self):
+        with mock.patch.object(NOTICE_ALLOWED_TYPED_CLASS, 'judge', autospec=True, return_value=([1], [1])) as judge:
+            judge_allowed_types('1')
+            judge_allowed_types('2')
+            invalidate_judge_cache('1')
+            judge_allowed_types('1')
+            judge_allowed_types('2')
+            self.assertEqual(judge.call_count, 3)
+            NoticeType.objects.create(name='extra', desc='EXTRA')
+            judge_allowed_types('2')
+            self.assertEqual(judge.call_count, 4)
+
+
+class PageCacheCase(TestCase):
+    fixtures = ('notice_types.json', 'receiver_types.json', 'notice.json', 'notice_tag.json')
+
+    def setUp(self):
+        patcher = mock.patch('notice.cache.NOTICE_PAGE_CACHE_TIMEOUT', 60)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        invalidate_notice_pages()
+        type_registry.warm()
+
+    def items(self, receiver):
+        return json.loads(get_page_notice(receiver, 1, 10).content)['items']
+
+    def test_shared(self):
+        self.assertListEqual([(i['id'], i['is_read']) for i in self.items('1')], [(15, True), (14, False), (5, True), (4, False)])
+        # the page comes from the cache: only the watermark and the read tags are queried
+        with self.assertNumQueries(2):
+            items = self.items('2')
+        self.assertListEqual([(i['id'], i['is_read']) for i in items], [(15, False), (14, False), (5, False), (4, False)])
+
+    def test_invalidate(self):
+        self.items('1')
+        notice = NoticeStore.objects.create(
+            title='new', notice_type_id=1, receiver_type_ids=[1], is_draft=False, creator_id=1, publish_at=timezone_now()
+        )
+        self.assertEqual(self.items('1')[0]['id'], notice.id)
+        notice.delete()
+        self.assertEqual(self.items('1')[0]['id'], 15)
+
+
+class NoticeStreamCase(TestCase):
+    fixtures = ('notice_types.json', 'receiver_types.json', 'notice.json', 'notice_tag.json')
+
+    async def test_counts(self):
+        stream = event_stream('1')
+        self.assertTrue((await anext(stream)).startswith('retry: '))
+        self.assertEqual(
+            await anext(stream), 'id: 1\nevent: counts\ndata: {"notice": 2, "private": 0, "backlog": 0}\n\n'
+        )
+
+        await sync_to_async(ReceiverTag.objects.create)(noticestore_id=4, receiver='1', read_at=timezone_now())
+        publish_event('2')
+        publish_event('1')
+        self.assertEqual(
+            await anext(stream), 'id: 2\nevent: counts\ndata: {"notice": 1, "private": 0, "backlog": 0}\n\n'
+        )
+        await stream.aclose()
+
+    async def test_broadcast(self):
+        with mock.patch('notice.views.stream.NOTICE_STREAM_BROADCAST_JITTER', 5), \
+                mock.patch('notice.views.stream.random.uniform', return_value=0.5), \
+                mock.patch('notice.views.stream.asyncio.sleep', new_callable=mock.AsyncMock) as sleep:
+            stream = event_stream('1')
+            await anext(stream)
+            await anext(stream)
+
+            await sync_to_async(ReceiverTag.objects.create)(noticestore_id=4, receiver='1', read_at=timezone_now())
+            publish_event(BROADCAST)
+            self.assertTrue((await anext(stream)).startswith('id: 2\n'))
+            sleep.assert_awaited_once_with(0.5)
+            await stream.aclose()
+
+    async def test_broadcast_once(self):
+        broker, queue = LocalBroker(), asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        broker.subscribe('1', loop, queue)
+        broker.subscribe(BROADCAST, loop, queue)
+        broker.publish({BROADCAST})
+        await asyncio.sleep(0)
+        self.assertEqual(queue.qsize(), 1)
+        self.assertEqual(queue.get_nowait(), BROADCAST)
+
+    async def test_heartbeat(self):
+        with mock.patch('notice.views.stream.NOTICE_STREAM_HEARTBEAT', 0.01):
+            stream = event_stream('1')
+            await anext(stream)
+            await anext(stream)
+            self.assertEqual(await anext(stream), ': heartbeat\n\n')
+            await stream.aclose()
+
+    async def test_auth(self):
+        resp = await self.async_client.get(reverse('notice-stream'))
+        self.assertEqual(resp.status_code, 401)
+
+
+class AsyncClientNoticeCase(TestCase):
+    """notice.async_urls answer exactly like their sync counterparts"""
+    fixtures = ('notice_types.json', 'receiver_types.json', 'notice.json', 'notice_tag.json')
+
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'user@test.com', '123456', pk=1)
+        self.client.login(username='testuser', password='123456')
+
+    async def test_list(self):
+        await self.async_client.aforce_login(self.user)
+        for params in (
+            {}, {'size': 2, 'page': 2}, {'cursor': '', 'size': 3}, {'title': 'x'}, {'title': 'X', 'search': 'icontains'},
+            {'search': 'x'}, {'cursor': '', 'search': 'similar'}, {'cursor': '!!'}
+        ):
+            resp = await self.async_client.get(reverse('async-client-list-notice'), params)
+            expected = await sync_to_async(self.client.get)(reverse('client-list-notice'), params)
+            self.assertEqual(resp.status_code, expected.status_code)
+            self.assertDictEqual(resp.json(), expected.json())
+
+    async def test_retrieve(self):
+        await self.async_client.aforce_login(self.user)
+        resp = await self.async_client.get(reverse('async-client-retrieve-notice', kwargs={'pk': 4}))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['id'], 4)
+        self.assertTrue(await ReceiverTag.objects.filter(noticestore_id=4, receiver='1').aexists())
+        resp = await self.async_client.get(reverse('async-client-retrieve-notice', kwargs={'pk': 1}))
+        self.assertEqual(resp.status_code, 404)
+
+    async def test_status(self):
+        await self.async_client.aforce_login(self.user)
+        resp = await self.async_client.get(reverse('async-client-notice-status'))
+        self.assertDictEqual(resp.json(), {'is_unread': True, 'unread': 2})
+
+    async def test_auth(self):
+        resp = await self.async_client.get(reverse('async-client-list-notice'))
+        self.assertEqual(resp.status_code, 401)
+
+
+class ReceiptBufferCase(TestCase):
+    fixtures = ('notice_types.json', 'receiver_types.json', 'notice.json', 'notice_tag.json')
+
+    def setUp(self):
+        self.buffer = ReceiptBuffer(flush_size=10, flush_interval=60)
+
+    def tearDown(self):
+        self.buffer.stop()
+
+    def test_flush(self):
+        self.buffer.put('1', 4)
+        self.buffer.put('1', 4)
+        self.buffer.put('1', 5)
+        self.buffer.put('2', 4)
+        self.assertFalse(ReceiverTag.objects.filter(noticestore_id=4, receiver='1').exists())
+
+        self.assertEqual(self.buffer.flush(), 4)
+        self.assertEqual(ReceiverTag.objects.filter(noticestore_id=4, receiver='1').count(), 1)
+        self.assertEqual(ReceiverTag.objects.filter(noticestore_id=5, receiver='1').count(), 1)
+        self.assertTrue(ReceiverTag.objects.filter(noticestore_id=4, receiver='2').exists())
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_flush_failed(self):
+        self.buffer.put('1', 4)
+        self.buffer.put('1', 5)
+        with mock.patch.object(ReceiverTag.objects, 'bulk_create', side_effect=DatabaseError):
+            self.assertRaises(DatabaseError, self.buffer.flush)
+        self.assertEqual([tag.noticestore_id for tag in self.buffer._pending], [4, 5])
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(ReceiverTag.objects.filter(receiver='1', noticestore_id__in=[4, 5]).count(), 2)
+
+
+class ClientNoticeIndexCase(TestCase):
+    """EXPLAIN of the client visibility query before/after the NoticeStore indexes"""
+    fixtures = ('notice_types.json', 'receiver_types.json', 'notice.json')
+
+    def setUp(self):
+        # drafts for other receiver types, so the visible rows are a small slice of the table
+        NoticeStore.objects.bulk_create([
+            NoticeStore(title='draft', notice_type_id=1, receiver_type_ids=[3], creator_id=1)
+            for _ in range(2000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE notice_noticestore')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def drop_index(self, name):
+        # rolled back with the test transaction
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX {}'.format(name))
+
+    def explain_visible(self):
+        return NoticeStore.objects.filter(
+            is_draft=False,
+            publish_at__lte=timezone_now(),
+            receiver_type_ids__overlap=[1],
+            notice_type_id__in=[1, 3],
+        ).explain()
+
+    def explain_receiver_type(self):
+        return NoticeStore.objects.filter(receiver_type_ids__overlap=[1]).explain()
+
+    def test_visible_before(self):
+        self.drop_index('notice_store_visible_idx')
+        self.assertNotIn('notice_store_visible_idx', self.explain_visible())
+
+    def test_visible_after(self):
+        self.assertIn('notice_store_visible_idx', self.explain_visible())
+
+    def test_receiver_type_before(self):
+        self.drop_index('notice_store_receiver_gin')
+        self.assertNotIn('notice_store_receiver_gin', self.explain_receiver_type())
+
+    def test_receiver_type_after(self):
+        self.assertIn('notice_store_receiver_gin', self.explain_receiver_type())
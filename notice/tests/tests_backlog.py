@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+@File        : tests_backlog.py
+@Description : python manage.py test notice.tests.tests_backlog -v 3 --keepdb
+"""
+import csv
+import io
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notice.models import Backlog, BacklogBatch
+from notice.tests.utils import create_receiver_row
+from notice.views.backlog import backlog_read, filter_conditions, get_backlog, handlers
+
+
+class BacklogCursorCase(TestCase):
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        for i in range(5):
+            create_receiver_row(
+                Backlog, receiver='1', obj_key='key{}'.format(i), is_done=i % 2 == 0, batch='batch{}'.format(i)
+            )
+        create_receiver_row(Backlog, receiver='2', obj_key='key0', batch='batch0')
+        self.client.login(username='tester', password='123456')
+
+    def test_cursor(self):
+        ids = list(Backlog.objects.filter(receiver='1').order_by('-id').values_list('id', flat=True))
+        resp = self.client.get(reverse('backlogs'), {'cursor': '', 'size': 2})
+        self.assertEqual(resp.status_code, 200)
+        resp_json = resp.json()
+        self.assertNotIn('total', resp_json)
+        self.assertListEqual([i['id'] for i in resp_json['items']], ids[:2])
+
+        seen = [i['id'] for i in resp_json['items']]
+        while resp_json['next_cursor']:
+            resp_json = self.client.get(reverse('backlogs'), {'cursor': resp_json['next_cursor'], 'size': 2}).json()
+            seen.extend(i['id'] for i in resp_json['items'])
+        self.assertListEqual(seen, ids)
+
+    def test_cursor_filter(self):
+        resp = self.client.get(reverse('backlogs'), {'cursor': '', 'size': 10, 'handle_status': '1'})
+        resp_json = resp.json()
+        self.assertEqual(len(resp_json['items']), 2)
+        self.assertTrue(all(not i['is_done'] for i in resp_json['items']))
+        self.assertIsNone(resp_json['next_cursor'])
+
+    def test_invalid_cursor(self):
+        resp = self.client.get(reverse('backlogs'), {'cursor': '!!'})
+        self.assertEqual(resp.status_code, 400)
+
+
+class BacklogAsyncCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        for i in range(5):
+            create_receiver_row(
+                Backlog, receiver='1', obj_key='key{}'.format(i), is_done=i % 2 == 0, batch='batch{}'.format(i)
+            )
+        self.client.login(username='tester', password='123456')
+
+    async def test_backlogs(self):
+        await self.async_client.aforce_login(self.user)
+        for params in ({}, {'handle_status': '1'}, {'cursor': '', 'size': 2}, {'keyword': 'key3'}, {'backlog_type': '9'}):
+            resp = await self.async_client.get(reverse('async-backlogs'), params)
+            expected = await sync_to_async(self.client.get)(reverse('backlogs'), params)
+            self.assertEqual(resp.status_code, expected.status_code)
+            self.assertDictEqual(resp.json(), expected.json())
+
+
+class BacklogExportCase(TestCase):
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        User.objects.create_user('admin', 'admin@test.com', '123456', pk=2, is_staff=True)
+        for i in range(5):
+            create_receiver_row(Backlog, 
+                receiver='1', obj_key='key{}'.format(i), is_done=i % 2 == 0, candidates=['a', 'b'], data={'i': i}
+            )
+        create_receiver_row(Backlog, receiver='2', obj_key='key0')
+
+    def export(self, username, **params):
+        self.client.login(username=username, password='123456')
+        resp = self.client.get(reverse('export-backlogs'), params)
+        self.assertTrue(resp.streaming)
+        return resp, b''.join(resp.streaming_content).decode()
+
+    def test_ndjson(self):
+        resp, content = self.export('tester', handle_status='1')
+        self.assertEqual(resp['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertListEqual([row['obj_key'] for row in rows], ['key1', 'key3'])
+        self.assertListEqual(rows[0]['candidates'], ['a', 'b'])
+        self.assertDictEqual(rows[0]['data'], {'i': 1})
+
+    def test_csv(self):
+        resp, content = self.export('tester', format='csv', receiver='2')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][:3], ['id', 'receiver', 'created_at'])
+        # receiver is ignored for non staff users
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(all(row[1] == '1' for row in rows[1:]))
+
+    def test_staff(self):
+        self.assertEqual(len(self.export('admin')[1].splitlines()), 6)
+        self.assertEqual(len(self.export('admin', receiver='2')[1].splitlines()), 1)
+
+    def test_staff_initiated(self):
+        # "launched by me" has no meaning for everyone
+        self.client.login(username='admin', password='123456')
+        self.assertEqual(self.client.get(reverse('export-backlogs'), {'backlog_type': '3'}).status_code, 400)
+        with self.assertRaises(CommandError):
+            call_command('export_notices', 'backlog', '--filter', 'backlog_type=3', stdout=io.StringIO())
+
+        BacklogBatch.objects.filter(obj_key='key1').update(initiator='1')
+        rows = self.export('admin', backlog_type='3', receiver='1')[1].splitlines()
+        self.assertListEqual([json.loads(line)['obj_key'] for line in rows], ['key1'])
+
+    def test_invalid(self):
+        self.client.login(username='tester', password='123456')
+        self.assertEqual(self.client.get(reverse('export-backlogs'), {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('export-backlogs'), {'flow_status': 'x'}).status_code, 400)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('export_notices', 'backlog', '--receiver', '1', '--filter', 'handle_status=2', '--chunk-size', '2', stdout=out)
+        self.assertListEqual(
+            [json.loads(line)['obj_key'] for line in out.getvalue().splitlines()], ['key0', 'key2', 'key4']
+        )
+        with self.assertRaises(CommandError):
+            call_command('export_notices', 'backlog', '--filter', 'handle_status=9', stdout=out)
+
+
+class BacklogCountCase(TestCase):
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        create_receiver_row(Backlog, receiver='1', initiator='1', is_done=False)
+        create_receiver_row(Backlog, receiver='1', initiator='2', is_done=False)
+        create_receiver_row(Backlog, receiver='1', initiator='1', is_done=True)
+        create_receiver_row(Backlog, receiver='2', initiator='1', is_done=False)
+        self.client.login(username='tester', password='123456')
+
+    def test_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            resp = get_backlog('1')
+        self.assertEqual(len(queries), 1)
+        # the batch table is only read by the initiator subquery
+        self.assertNotIn('JOIN', queries[0]['sql'])
+        self.assertIn('FROM "notice_backlog_batch"', queries[0]['sql'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertDictEqual(
+            json.loads(resp.content), {'pending_num': 2, 'processed_num': 1, 'initiator_num': 2, 'total': 3}
+        )
+
+    def test_not_found(self):
+        self.assertEqual(get_backlog('3').status_code, 404)
+
+    def test_view(self):
+        resp = self.client.get(reverse('backlog'))
+        self.assertEqual(resp.json()['total'], 3)
+
+
+class BacklogReadCase(TestCase):
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        self.first = create_receiver_row(Backlog, receiver='1', obj_key='apply-1', batch='batch0')
+        self.second = create_receiver_row(Backlog, receiver='1', obj_key='leave-1', batch='batch1', is_done=True)
+        self.third = create_receiver_row(Backlog, receiver='1', obj_key='apply-2', batch='batch2')
+        self.other = create_receiver_row(Backlog, receiver='2', obj_key='apply-1', batch='batch0')
+        self.client.login(username='tester', password='123456')
+
+    def read(self, data):
+        return self.client.put(reverse('read-backlogs'), json.dumps(data), content_type='application/json')
+
+    def unread(self):
+        return set(Backlog.objects.filter(is_read=False).values_list('id', flat=True))
+
+    def test_single(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(backlog_read(self.first.id, '1').status_code, 200)
+        self.assertTrue(Backlog.objects.get(pk=self.first.id).is_read)
+        self.assertEqual(backlog_read(self.other.id, '1').status_code, 404)
+        self.assertFalse(Backlog.objects.get(pk=self.other.id).is_read)
+
+    def test_ids(self):
+        resp = self.read({'ids': [self.first.id, self.other.id]})
+        self.assertEqual(resp.json()['count'], 1)
+        self.assertSetEqual(self.unread(), {self.second.id, self.third.id, self.other.id})
+
+    def test_batch(self):
+        self.assertEqual(self.read({'batch': 'batch0'}).json()['count'], 1)
+        self.assertSetEqual(self.unread(), {self.second.id, self.third.id, self.other.id})
+
+    def test_filters(self):
+        resp = self.read({'filters': {'keyword': 'apply', 'handle_status': 1}})
+        self.assertEqual(resp.json()['count'], 2)
+        self.assertSetEqual(self.unread(), {self.second.id, self.other.id})
+
+    def test_invalid(self):
+        self.assertEqual(self.read({}).status_code, 400)
+        self.assertEqual(self.read({'filters': {'handle_status': '9'}}).status_code, 400)
+        self.assertEqual(self.read({'filters': ['keyword']}).status_code, 400)
+        self.assertEqual(self.read({'ids': [True]}).status_code, 400)
+        self.assertEqual(self.read(['batch0']).status_code, 400)
+        resp = self.client.put(reverse('read-backlogs'), '{"batch": ', content_type='application/json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(len(self.unread()), 4)
+
+
+class BacklogKeywordCase(TestCase):
+    def setUp(self):
+        create_receiver_row(Backlog, receiver='1', obj_key='apply-1', obj_name='leave', initiator='7')
+        create_receiver_row(Backlog, receiver='1', obj_key='order-2', obj_name='apply leave', initiator='8')
+        create_receiver_row(Backlog, receiver='1', obj_key='order-3', obj_name='purchase', initiator='77')
+        create_receiver_row(Backlog, receiver='2', obj_key='apply-1', obj_name='leave', initiator='7')
+
+    def keys(self, keyword):
+        queryset = Backlog.objects.filter(receiver='1').filter(filter_conditions('1', {'keyword': keyword}))
+        return sorted(queryset.values_list('batch__obj_key', flat=True))
+
+    def test_keyword(self):
+        self.assertListEqual(self.keys('apply'), ['apply-1', 'order-2'])
+        self.assertListEqual(self.keys('order-'), ['order-2', 'order-3'])
+        # initiator matches exactly
+        self.assertListEqual(self.keys('7'), ['apply-1'])
+        self.assertListEqual(self.keys('nothing'), [])
+
+
+class BacklogBatchCase(TestCase):
+    """the payload is stored once per batch and read through it"""
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        self.client.login(username='tester', password='123456')
+
+    def test_create(self):
+        data = {
+            'receiver': ['1', '2', '3'], 'obj_key': 'apply-1', 'initiator': '1', 'candidates': ['2', '3'],
+            'data': {'url': '/apply/1'}
+        }
+        resp = self.client.post(reverse('backlog'), json.dumps(data), content_type='application/json')
+        self.assertEqual(len(resp.json()['id']), 3)
+        self.assertEqual(BacklogBatch.objects.count(), 1)
+        self.assertEqual(Backlog.objects.filter(batch__obj_key='apply-1').count(), 3)
+
+        item = self.client.get(reverse('backlogs')).json()['items'][0]
+        self.assertDictEqual(
+            {key: item[key] for key in ('obj_key', 'initiator', 'candidates', 'data', 'creator', 'is_done', 'is_read')},
+            {
+                'obj_key': 'apply-1', 'initiator': '1', 'candidates': ['2', '3'], 'data': {'url': '/apply/1'},
+                'creator': '1', 'is_done': False, 'is_read': False
+            }
+        )
+
+    def test_handle(self):
+        first = create_receiver_row(Backlog, receiver='1', batch='batch0', candidates=['2'])
+        create_receiver_row(Backlog, receiver='2', batch='batch0')
+        resp = self.client.put(
+            reverse('handle-backlog', kwargs={'pk': first.id}), json.dumps({'node_handlers': ['4']}),
+            content_type='application/json'
+        )
+        self.assertEqual(resp.status_code, 200)
+        backlog_batch = BacklogBatch.objects.get(batch='batch0')
+        self.assertListEqual(backlog_batch.candidates, ['4'])
+        self.assertIsNotNone(backlog_batch.done_at)
+        self.assertFalse(Backlog.objects.filter(batch='batch0', is_done=False).exists())
+
+
+class BacklogHandlerCase(TestCase):
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        self.client.login(username='tester', password='123456')
+        create_receiver_row(Backlog, receiver='2', initiator='1', batch='batch0', candidates=['b_1', 'a'])
+        create_receiver_row(Backlog, receiver='3', initiator='1', batch='batch1', candidates=['a', 'bx', 'c'])
+        create_receiver_row(Backlog, receiver='3', initiator='9', batch='batch2', candidates=['z'])
+
+    def handler_list(self, **params):
+        return self.client.get(reverse('handler-list'), params)
+
+    def test_distinct(self):
+        self.assertDictEqual(self.handler_list().json(), {'handler_list': ['a', 'b_1', 'bx', 'c']})
+
+    def test_not_found(self):
+        BacklogBatch.objects.filter(initiator='1').update(initiator='8')
+        self.assertEqual(self.handler_list().status_code, 404)
+
+    def test_prefix(self):
+        self.assertListEqual(self.handler_list(prefix='b').json()['handler_list'], ['b_1', 'bx'])
+        # LIKE wildcards in the prefix match literally
+        self.assertListEqual(self.handler_list(prefix='b_').json()['handler_list'], ['b_1'])
+        self.assertListEqual(self.handler_list(prefix='%').json()['handler_list'], [])
+
+    def test_page(self):
+        self.assertDictEqual(
+            self.handler_list(page=2, size=3).json(), {'handler_list': ['c'], 'total': 4, 'page': 2, 'size': 3}
+        )
+        self.assertEqual(self.handler_list(size=0).status_code, 400)
+        self.assertEqual(self.handler_list(page=0, size=3).status_code, 400)
+
+    def test_cache(self):
+        with mock.patch('notice.cache.NOTICE_HANDLER_CACHE_TIMEOUT', 60):
+            self.handler_list()
+            with self.assertNumQueries(0):
+                self.assertListEqual(json.loads(handlers('1').content)['handler_list'], ['a', 'b_1', 'bx', 'c'])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('backlog'), json.dumps(
+                    {'receiver': ['2'], 'initiator': '1', 'candidates': ['d']}
+                ), content_type='application/json')
+            self.assertListEqual(self.handler_list().json()['handler_list'], ['a', 'b_1', 'bx', 'c', 'd'])
+
+            first = Backlog.objects.get(batch='batch1')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.force_login(User.objects.create_user('handler', pk=3))
+                self.client.put(
+                    reverse('handle-backlog', kwargs={'pk': first.id}), json.dumps({'node_handlers': ['e']}),
+                    content_type='application/json'
+                )
+            self.client.login(username='tester', password='123456')
+            self.assertListEqual(self.handler_list().json()['handler_list'], ['a', 'b_1', 'd', 'e'])
+
+
+class BacklogIndexCase(TestCase):
+    """query shapes of the backlog endpoints resolve to the notice_backlog indexes"""
+    def setUp(self):
+        create_receiver_row(Backlog, receiver='1', initiator='1', batch='batch0', candidates=['2', '3'])
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_receiver(self):
+        plan = Backlog.objects.filter(receiver='1', is_done=False).order_by('-id').explain()
+        self.assertIn('notice_backlog_receiver_idx', plan)
+
+    def test_initiator(self):
+        plan = BacklogBatch.objects.filter(initiator='1').values('candidates').explain()
+        self.assertIn('notice_backlog_initiator_idx', plan)
+
+    def test_batch(self):
+        plan = Backlog.objects.filter(batch='batch0').explain()
+        self.assertIn('notice_backlog_batch_idx', plan)
+
+    def test_candidates(self):
+        plan = BacklogBatch.objects.filter(candidates__contains=['2']).explain()
+        self.assertIn('notice_backlog_candidates_gin', plan)
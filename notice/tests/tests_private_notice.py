@@ -6,13 +6,19 @@
 @Description : python manage.py test notice.tests.tests_private_notice.PrivateNoticeCase.test_privates  -v 3 --keepdb
 """
 import json
+from unittest import mock
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from notice.models import PrivateNotice
+from notice.ingest import create_private_notices
+from notice.models import PrivateMessage, PrivateNotice
 from notice.response import NotFound
+from notice.tests.utils import create_receiver_row
 
 
 class PrivateNoticeCase(TestCase):
@@ -113,3 +119,206 @@ class PrivateNoticeCase(TestCase):
         self.assertTrue(privates.exists())
         for private in privates:
             self.assertEqual(private.is_node_done, True)
+
+
+class PrivateNoticeCursorCase(TestCase):
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        for i in range(5):
+            create_receiver_row(PrivateNotice, receiver='1', title='title{}'.format(i), is_read=i < 2)
+        create_receiver_row(PrivateNotice, receiver='2', title='title0')
+        self.client.login(username='tester', password='123456')
+
+    def test_cursor(self):
+        ids = list(PrivateNotice.objects.filter(receiver='1').order_by('-id').values_list('id', flat=True))
+        resp = self.client.get(reverse('privates'), {'cursor': '', 'size': 3})
+        self.assertEqual(resp.status_code, 200)
+        resp_json = resp.json()
+        self.assertNotIn('total', resp_json)
+        self.assertListEqual([i['id'] for i in resp_json['items']], ids[:3])
+
+        resp_json = self.client.get(reverse('privates'), {'cursor': resp_json['next_cursor'], 'size': 3}).json()
+        self.assertListEqual([i['id'] for i in resp_json['items']], ids[3:])
+        self.assertIsNone(resp_json['next_cursor'])
+
+    def test_cursor_is_index(self):
+        resp = self.client.get(reverse('privates'), {'cursor': '', 'is_index': 'true'})
+        resp_json = resp.json()
+        self.assertListEqual([i['title'] for i in resp_json['items']], ['title4', 'title3', 'title2'])
+
+
+class PrivateNoticeSearchCase(TestCase):
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        for title in ('Weekly Report', 'weekly report draft', 'monthly report'):
+            create_receiver_row(PrivateNotice, receiver='1', title=title)
+        self.client.login(username='tester', password='123456')
+
+    def titles(self, **params):
+        return [i['title'] for i in self.client.get(reverse('privates'), params).json()['items']]
+
+    def test_search(self):
+        self.assertListEqual(self.titles(title='weekly'), ['weekly report draft'])
+        self.assertListEqual(self.titles(title='weekly', search='icontains'), ['weekly report draft', 'Weekly Report'])
+        self.assertEqual(self.client.get(reverse('privates'), {'search': 'x'}).status_code, 400)
+
+    def test_similar_unavailable(self):
+        with mock.patch.dict('notice.helpers._trigram_installed', {'default': False}):
+            for name in ('privates', 'async-privates'):
+                resp = self.client.get(reverse(name), {'title': 'weekly', 'search': 'similar'})
+                self.assertEqual(resp.status_code, 400)
+
+
+class PrivateNoticeAsyncCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        for i in range(5):
+            create_receiver_row(PrivateNotice, receiver='1', title='title{}'.format(i), is_read=i < 2)
+        self.client.login(username='tester', password='123456')
+
+    async def test_privates(self):
+        await self.async_client.aforce_login(self.user)
+        for params in (
+            {}, {'is_index': 'true'}, {'cursor': '', 'size': 2}, {'page': 'x'},
+            {'title': 'TITLE1', 'search': 'icontains'}, {'search': 'x'}
+        ):
+            resp = await self.async_client.get(reverse('async-privates'), params)
+            expected = await sync_to_async(self.client.get)(reverse('privates'), params)
+            self.assertEqual(resp.status_code, expected.status_code)
+            self.assertDictEqual(resp.json(), expected.json())
+
+
+class PrivateNoticeCreateCase(TestCase):
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        self.client.login(username='tester', password='123456')
+
+    def create(self, receivers):
+        return self.client.post(
+            reverse('private'), {'receiver': receivers, 'title': 'hello', 'content': 'world'},
+            content_type='application/json'
+        )
+
+    def test_create(self):
+        resp_json = self.create(['8', '9', '10']).json()
+        self.assertEqual(resp_json['count'], 3)
+        privates = PrivateNotice.objects.filter(batch=resp_json['batch'])
+        self.assertListEqual(sorted(resp_json['id']), sorted(privates.values_list('id', flat=True)))
+        self.assertSetEqual({(p.receiver, p.batch.title, p.batch.content, p.batch.creator) for p in privates}, {
+            ('8', 'hello', 'world', '1'), ('9', 'hello', 'world', '1'), ('10', 'hello', 'world', '1')
+        })
+        self.assertEqual(PrivateMessage.objects.count(), 1)
+
+        private = privates.get(receiver='8')
+        private.receiver = '1'
+        private.save()
+        resp = self.client.get(reverse('private-notice-detail', kwargs={'pk': private.id}))
+        resp_json = resp.json()
+        resp_json.pop('created_at')
+        self.assertDictEqual(resp_json, {'id': private.id, 'title': 'hello', 'content': 'world', 'data': {}})
+        resp = self.client.get(reverse('private-notice-detail', kwargs={'pk': privates.get(receiver='9').id}))
+        self.assertEqual(resp.status_code, 404)
+
+    def test_no_receiver(self):
+        self.assertTupleEqual(create_private_notices({'title': 'hello'}, iter([])), (0, None, []))
+        self.assertFalse(PrivateMessage.objects.exists())
+
+    def test_chunks(self):
+        receivers = (str(i) for i in range(5))
+        with CaptureQueriesContext(connection) as queries:
+            count, batch, ids = create_private_notices({'title': 'hello'}, receivers, batch_size=2)
+        self.assertEqual(count, 5)
+        self.assertIsNone(ids)
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('INSERT INTO "notice_private_notice"')]), 3)
+        self.assertEqual(PrivateMessage.objects.filter(batch=batch, title='hello').count(), 1)
+        self.assertEqual(PrivateNotice.objects.filter(batch=batch).count(), 5)
+
+    def test_copy(self):
+        values = {'title': 'a "quoted", title', 'content': '', 'data': {'k': ['v']}, 'creator': None}
+        count, batch, ids = create_private_notices(values, ['1', '2', '3'], batch_size=2, use_copy=True)
+        self.assertEqual(count, 3)
+        self.assertIsNone(ids)
+        privates = PrivateNotice.objects.filter(batch=batch)
+        self.assertEqual(privates.count(), 3)
+        for private in privates:
+            self.assertEqual(private.batch.title, 'a "quoted", title')
+            self.assertEqual(private.batch.content, '')
+            self.assertIsNone(private.batch.creator)
+            self.assertDictEqual(private.batch.data, {'k': ['v']})
+            self.assertFalse(private.is_read)
+
+        with mock.patch('notice.views.private_notice.NOTICE_PRIVATE_COPY_THRESHOLD', 2):
+            resp_json = self.create(['8', '9']).json()
+        self.assertNotIn('id', resp_json)
+        self.assertEqual(PrivateNotice.objects.filter(batch=resp_json['batch'], batch__content='world').count(), 2)
+
+
+class PrivateNoticeExportCase(TestCase):
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        for i in range(5):
+            create_receiver_row(PrivateNotice, receiver='1', title='title{}'.format(i), is_read=i < 2)
+        create_receiver_row(PrivateNotice, receiver='2', title='title0')
+        self.client.login(username='tester', password='123456')
+
+    def test_export(self):
+        resp = self.client.get(reverse('export-privates'), {'is_index': 'true'})
+        rows = [json.loads(line) for line in b''.join(resp.streaming_content).decode().splitlines()]
+        self.assertListEqual([row['title'] for row in rows], ['title2', 'title3', 'title4'])
+        self.assertTrue(all(row['receiver'] == '1' and not row['is_read'] for row in rows))
+
+        resp = self.client.get(reverse('export-privates'), {'format': 'csv', 'title': 'title1'})
+        self.assertEqual(resp['Content-Disposition'], 'attachment; filename="privates.csv"')
+        self.assertEqual(len(b''.join(resp.streaming_content).decode().splitlines()), 2)
+
+
+class PrivateNoticeBulkReadCase(TestCase):
+    def setUp(self):
+        User.objects.create_user('tester', 'user@test.com', '123456', pk=1)
+        self.ids = [create_receiver_row(PrivateNotice, receiver='1', title='title{}'.format(i)).id for i in range(4)]
+        self.other = create_receiver_row(PrivateNotice, receiver='2', title='title0').id
+        self.client.login(username='tester', password='123456')
+
+    def read(self, data):
+        return self.client.put(reverse('read-privates'), json.dumps(data), content_type='application/json')
+
+    def test_ids(self):
+        resp = self.read({'ids': [self.ids[0], self.ids[1], self.other]})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['count'], 2)
+        self.assertFalse(PrivateNotice.objects.get(pk=self.other).is_read)
+        self.assertEqual(self.read({'ids': [self.ids[0]]}).json()['count'], 0)
+
+    def test_max_id(self):
+        resp = self.read({'max_id': self.ids[2]})
+        self.assertEqual(resp.json()['count'], 3)
+        self.assertListEqual(
+            list(PrivateNotice.objects.filter(receiver='1', is_read=False).values_list('id', flat=True)), [self.ids[3]]
+        )
+
+    def test_invalid(self):
+        self.assertEqual(self.read({}).status_code, 400)
+        self.assertEqual(self.read({'ids': 'all'}).status_code, 400)
+        self.assertEqual(self.read({'max_id': '3'}).status_code, 400)
+        self.assertEqual(self.read({'ids': [1, True]}).status_code, 400)
+        self.assertEqual(self.read({'max_id': True}).status_code, 400)
+        self.assertEqual(self.read([1, 2]).status_code, 400)
+        resp = self.client.put(reverse('read-privates'), '{"ids": [1', content_type='application/json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(PrivateNotice.objects.filter(is_read=True).exists())
+
+
+class PrivateNoticeIndexCase(TestCase):
+    """unread badge and home feed resolve to the notice_private_notice indexes"""
+    def setUp(self):
+        create_receiver_row(PrivateNotice, receiver='1', title='title0')
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_unread(self):
+        plan = PrivateNotice.objects.filter(receiver='1', is_read=False).order_by('-id').explain()
+        self.assertIn('notice_private_unread_idx', plan)
+
+    def test_receiver(self):
+        plan = PrivateNotice.objects.filter(receiver='1').order_by('-id').explain()
+        self.assertIn('notice_private_receiver_idx', plan)
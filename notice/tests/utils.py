@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+@File        : utils.py
+@Description : shared test helpers
+"""
+import uuid
+
+
+def create_receiver_row(model, receiver, batch=None, **fields):
+    """
+    one `receiver` row of Backlog or PrivateNotice
+
+    `fields` of `model` go on the row, the others on the shared batch row, created on first use of `batch`
+    """
+    own = {field.name for field in model._meta.concrete_fields}
+    row_fields = {name: fields.pop(name) for name in list(fields) if name in own}
+    shared, _ = model._meta.get_field('batch').related_model.objects.get_or_create(
+        batch=batch or str(uuid.uuid4()), defaults=fields
+    )
+    return model.objects.create(batch=shared, receiver=receiver, **row_fields)
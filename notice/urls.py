@@ -10,6 +10,7 @@ from notice.views import admin as admin_views
 from notice.views import client as client_views
 from notice.views import private_notice
 from notice.views import backlog
+from notice.views import export
 
 admin_urlpatterns = [
     path('admin/', admin_views.notice, name='admin-notice'),
@@ -23,17 +24,22 @@ client_urlpatterns = [
     path('client/', client_views.list_notice, name='client-list-notice'),
     path('client/<int:pk>/', client_views.some_notice, name='client-retrieve-notice'),
     path('client/status/', client_views.notice_status, name='client-notice-status'),
+    path('client/read/', client_views.read_notice, name='client-read-notice'),
 ]
 
 private_urlpatterns = [
     path('private/', private_notice.private, name="private"),
     path('privates/', private_notice.privates, name="privates"),
+    path('privates/read/', private_notice.read_private_notices, name="read-privates"),
+    path('privates/export/', export.export_privates, name="export-privates"),
     path('private/<int:pk>/', private_notice.private_notice_detail, name="private-notice-detail"),
 ]
 
 backlog_urlpatterns = [
     path('backlog/', backlog.backlog, name="backlog"),
     path('backlogs/', backlog.backlogs, name="backlogs"),
+    path('backlogs/read/', backlog.read_backlogs, name="read-backlogs"),
+    path('backlogs/export/', export.export_backlogs, name="export-backlogs"),
     path('backlog/<int:pk>/', backlog.read_backlog, name="read-backlog"),
     path('backlog/handler/', backlog.handler_list, name="handler-list"),
     path('backlog/current_node/<int:pk>/', backlog.handle_backlog, name="handle-backlog"),
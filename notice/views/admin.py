@@ -11,21 +11,22 @@ from django.http import JsonResponse, HttpRequest
 from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 
+from notice.cache import invalidate_notice_pages
+from notice.events import broadcast_event
 from notice.forms import NoticeForm, ChangeTimingForm
-from notice.models import NoticeStore, NoticeType, ReceiverType
+from notice.models import NoticeStore
+from notice.registry import type_registry
 from notice.response import AuthFailed, NotFound, ValidationFailed, ValidationFailedDetailEnum
 from notice.settings import NOTICE_DATETIME_FORMAT
 
 
 def list_all_notice_types(request):
-    notice_types = NoticeType.objects.all().only('id', 'desc').order_by('id')
-    data = [{'id': item.id, 'desc': item.desc} for item in notice_types]
+    data = [{'id': item['id'], 'desc': item['desc']} for item in type_registry.rows('NoticeType')]
     return JsonResponse(data=data, safe=False)
 
 
 def list_all_receiver_types(request):
-    receiver_types = ReceiverType.objects.all().only('id', 'desc').order_by('id')
-    data = [{'id': item.id, 'desc': item.desc} for item in receiver_types]
+    data = [{'id': item['id'], 'desc': item['desc']} for item in type_registry.rows('ReceiverType')]
     return JsonResponse(data=data, safe=False)
 
 
@@ -94,7 +95,7 @@ def notice(request: HttpRequest):
 
 def retrieve_notice(pk: int):
     notice = NoticeStore.objects.filter(pk=pk).only(
-        'is_draft', 'publish_at', 'title', 'content', 'notice_type_id', 'receiver_type_ids',
+        'is_draft', 'is_published', 'publish_at', 'title', 'content', 'notice_type_id', 'receiver_type_ids',
     ).first()
     if not notice:
         return NotFound()
@@ -151,6 +152,9 @@ def put_notice(data: dict, pk: int):
     if update_params:
         update_params['updated_at'] = timezone.now()
         NoticeStore.objects.filter(pk=pk).update(**update_params)
+        # update() sends no post_save, and a draft sent now becomes visible
+        invalidate_notice_pages()
+        broadcast_event()
     return JsonResponse(data={})
 
 
@@ -197,6 +201,7 @@ def delete_timing(pk):
 
     NoticeStore.objects.filter(pk=pk).update(
         is_draft=True,
+        is_published=False,
         updated_at=timezone.now(),
         publish_at=None
     )
@@ -0,0 +1,190 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : native async variants of the read-heavy client views, serve them with ASGI
+
+           query parsing, querysets and responses are the ones of the sync views, only the fetches are awaited
+@Author  : Rey
+@Time    : 2026-10-18 15:00:00
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest
+from django.views.decorators.http import require_GET
+
+from notice.cache import acached_notice_page, judge_allowed_types
+from notice.events import publish_event
+from notice.helpers import apaginate_by_cursor, apaginate_by_page, cursor_response, page_response
+from notice.models import ReceiverTag
+from notice.receipts import receipt_buffer
+from notice.response import AuthFailed, NotFound
+from notice.settings import NOTICE_RECEIPT_BUFFER
+from notice.views.backlog import backlog_queryset, check_backlogs_params, serialize_backlog
+from notice.views.client import (
+    EMPTY_PAGE, above_watermark, below_watermark, check_list_params, detail_queryset, detail_response,
+    notice_cursor_response, notice_page_response, notice_queryset, page_key, page_rows, read_tag, serialize_notices,
+    status_response, tag_ids, unread_queryset, watermark_queryset
+)
+from notice.views.private_notice import check_privates_params, filter_private, serialize_private
+
+
+async def _receiver(request: HttpRequest):
+    """pk of the authenticated user as str, or None"""
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    return None if user is None else str(user.pk)
+
+
+async def _notice_items(receiver, rows):
+    if not rows:
+        return []
+    above = above_watermark(rows, await watermark_queryset(receiver).afirst())
+    tags = {pk async for pk in tag_ids(receiver, above)} if above else set()
+    return serialize_notices(rows, above, tags)
+
+
+async def aget_page_notice(receiver, page, size, title=None, search='contains', **kwargs):
+    allowed_notice_type_ids, allowed_receiver_type_ids = await sync_to_async(judge_allowed_types)(receiver, **kwargs)
+    if not allowed_notice_type_ids or not allowed_receiver_type_ids:
+        return notice_page_response(page, EMPTY_PAGE, [])
+
+    async def build():
+        total, max_page, rows = await apaginate_by_page(
+            notice_queryset(allowed_notice_type_ids, allowed_receiver_type_ids, title, search), page, size
+        )
+        return {'total': total, 'max_page': max_page, 'rows': page_rows(rows)}
+
+    data = await acached_notice_page(
+        page_key('page', allowed_notice_type_ids, allowed_receiver_type_ids, title, search, page, size), build
+    )
+    return notice_page_response(page, data, await _notice_items(receiver, data['rows']))
+
+
+async def aget_cursor_notice(receiver, cursor, size, title=None, search='contains', **kwargs):
+    allowed_notice_type_ids, allowed_receiver_type_ids = await sync_to_async(judge_allowed_types)(receiver, **kwargs)
+    if not allowed_notice_type_ids or not allowed_receiver_type_ids:
+        return notice_cursor_response(EMPTY_PAGE, [], size)
+
+    async def build():
+        rows, next_cursor = await apaginate_by_cursor(
+            notice_queryset(allowed_notice_type_ids, allowed_receiver_type_ids, title, search), cursor, size
+        )
+        return {'rows': page_rows(rows), 'next_cursor': next_cursor}
+
+    data = await acached_notice_page(
+        page_key('cursor', allowed_notice_type_ids, allowed_receiver_type_ids, title, search, cursor, size), build
+    )
+    return notice_cursor_response(data, await _notice_items(receiver, data['rows']), size)
+
+
+@require_GET
+async def list_notice(request: HttpRequest):
+    receiver = await _receiver(request)
+    if receiver is None:
+        return AuthFailed()
+
+    # the pg_trgm lookup of `similar` runs once per process, off the event loop
+    is_valid, query = await sync_to_async(check_list_params)(request.GET)
+    if not is_valid:
+        return query
+
+    if query['cursor'] is not None:
+        return await aget_cursor_notice(receiver, query['cursor'], query['size'], query['title'], query['search'])
+    return await aget_page_notice(receiver, query['page'], query['size'], query['title'], query['search'])
+
+
+async def aretrieve_notice(receiver, pk, **kwargs):
+    allowed_notice_type_ids, allowed_receiver_type_ids = await sync_to_async(judge_allowed_types)(receiver, **kwargs)
+    if not allowed_notice_type_ids or not allowed_receiver_type_ids:
+        return NotFound()
+
+    notice = await detail_queryset(receiver, pk, allowed_notice_type_ids, allowed_receiver_type_ids).afirst()
+    if not notice:
+        return NotFound()
+
+    if below_watermark(notice):
+        pass
+    elif NOTICE_RECEIPT_BUFFER:
+        receipt_buffer.put(receiver, pk)
+    else:
+        await ReceiverTag.objects.abulk_create([read_tag(receiver, pk)], ignore_conflicts=True)
+        await sync_to_async(publish_event)(receiver)
+
+    return detail_response(notice)
+
+
+@require_GET
+async def some_notice(request: HttpRequest, pk: int):
+    receiver = await _receiver(request)
+    if receiver is None:
+        return AuthFailed()
+
+    return await aretrieve_notice(receiver, pk)
+
+
+async def acount_unread_notice(receiver, **kwargs) -> int:
+    allowed_notice_type_ids, allowed_receiver_type_ids = await sync_to_async(judge_allowed_types)(receiver, **kwargs)
+    if not allowed_notice_type_ids or not allowed_receiver_type_ids:
+        return 0
+
+    return await unread_queryset(
+        receiver, allowed_notice_type_ids, allowed_receiver_type_ids, await watermark_queryset(receiver).afirst()
+    ).acount()
+
+
+@require_GET
+async def notice_status(request: HttpRequest):
+    receiver = await _receiver(request)
+    if receiver is None:
+        return AuthFailed()
+
+    return status_response(await acount_unread_notice(receiver))
+
+
+async def alist_private(page: int, size: int, title: str, is_index: bool, receiver: str, search: str = 'contains'):
+    total, max_page, rows = await apaginate_by_page(filter_private(title, is_index, receiver, search), page, size)
+    return page_response(total, max_page, page, size, [serialize_private(item) for item in rows])
+
+
+async def acursor_private(cursor: str, size: int, title: str, is_index: bool, receiver: str, search: str = 'contains'):
+    rows, next_cursor = await apaginate_by_cursor(filter_private(title, is_index, receiver, search), cursor, size)
+    return cursor_response([serialize_private(item) for item in rows], next_cursor, size)
+
+
+@require_GET
+async def privates(request: HttpRequest):
+    receiver = await _receiver(request)
+    if receiver is None:
+        return AuthFailed()
+
+    is_valid, query = await sync_to_async(check_privates_params)(request.GET)
+    if not is_valid:
+        return query
+
+    cursor = query.pop('cursor')
+    page = query.pop('page')
+    if cursor is not None:
+        return await acursor_private(cursor, receiver=receiver, **query)
+    return await alist_private(page, receiver=receiver, **query)
+
+
+async def alist_backlog(page: int, size: int, params: dict, receiver: str):
+    total, max_page, rows = await apaginate_by_page(backlog_queryset(receiver, params), page, size)
+    return page_response(total, max_page, page, size, [serialize_backlog(item) for item in rows])
+
+
+async def acursor_backlog(cursor: str, size: int, params: dict, receiver: str):
+    rows, next_cursor = await apaginate_by_cursor(backlog_queryset(receiver, params), cursor, size)
+    return cursor_response([serialize_backlog(item) for item in rows], next_cursor, size)
+
+
+@require_GET
+async def backlogs(request: HttpRequest):
+    receiver = await _receiver(request)
+    if receiver is None:
+        return AuthFailed()
+
+    is_valid, query = check_backlogs_params(request.GET.dict())
+    if not is_valid:
+        return query
+
+    if query['cursor'] is not None:
+        return await acursor_backlog(query['cursor'], query['size'], query['params'], receiver)
+    return await alist_backlog(query['page'], query['size'], query['params'], receiver)
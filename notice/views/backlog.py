@@ -6,16 +6,21 @@
 """
 import re
 import json
-import math
 import uuid
 
 from django.utils import timezone
 from django.http import JsonResponse, HttpRequest
-from django.db.models import Q
+from django.db import connection, transaction
+from django.db.models import Count, Q, Subquery
 from django.views.decorators.http import require_http_methods
 
+from notice.cache import cached_handler_list, invalidate_handler_list
+from notice.events import publish_event
 from notice.forms import BacklogForm
-from notice.models import Backlog
+from notice.helpers import (
+    cursor_response, decode_cursor, is_int_list, load_json_object, page_response, paginate_by_cursor, paginate_by_page
+)
+from notice.models import Backlog, BacklogBatch
 from notice.response import AuthFailed, NotFound, ValidationFailed, ValidationFailedDetailEnum
 from notice.settings import NOTICE_DATETIME_FORMAT
 
@@ -33,28 +38,30 @@ def create_backlog(data: dict, receivers: list, creator: str):
     clean_data['creator'] = creator
     clean_data['data'] = data.get("data")
     clean_data.pop("receiver")
-    clean_data["batch"] = uuid.uuid4()
-    backlog_notices = [Backlog(**clean_data, receiver=receiver, ) for receiver in receivers]
-    backlog_objs = Backlog.objects.bulk_create(backlog_notices)
+    is_done = clean_data.pop("is_done")
+    with transaction.atomic():
+        batch = BacklogBatch.objects.create(**clean_data, batch=str(uuid.uuid4()))
+        backlog_notices = [Backlog(batch=batch, receiver=receiver, is_done=is_done) for receiver in receivers]
+        backlog_objs = Backlog.objects.bulk_create(backlog_notices)
+        transaction.on_commit(lambda: invalidate_handler_list(batch.initiator))
+    publish_event(*receivers)
 
     return JsonResponse(data={'id': [backlog_notice.id for backlog_notice in backlog_objs]})
 
 
 # Gets the current user backlog number
 def get_backlog(receiver: str):
-    if not Backlog.objects.filter(receiver=receiver).exists():
+    # one join-free conditional aggregate over notice_backlog_receiver_idx; the initiator lives on the batch,
+    # its uncorrelated subquery runs once over notice_backlog_initiator_idx
+    initiated = BacklogBatch.objects.filter(initiator=receiver).values('batch')
+    data = Backlog.objects.filter(receiver=receiver).aggregate(
+        pending_num=Count('id', filter=Q(is_done=False)),
+        processed_num=Count('id', filter=Q(is_done=True)),
+        initiator_num=Count('id', filter=Q(batch__in=Subquery(initiated))),
+        total=Count('id'),
+    )
+    if not data['total']:
         return NotFound()
-
-    backlog_num = Backlog.objects.filter(receiver=receiver, is_done=False).count()
-    processed_num = Backlog.objects.filter(receiver=receiver, is_done=True).count()
-    initiator_num = Backlog.objects.filter(receiver=receiver, initiator=receiver).count()
-    total = backlog_num + processed_num
-    data = {
-        "pending_num": backlog_num,
-        "processed_num": processed_num,
-        "initiator_num": initiator_num,
-        "total": total
-    }
     return JsonResponse(data)
 
 
@@ -121,16 +128,16 @@ def filter_conditions(receiver: str, params: dict):
             condition = []
             if key == "keyword":
                 condition = [
-                    ("obj_key__contains", value),
-                    ("obj_name__contains", value),
-                    ("initiator", value)
+                    ("batch__obj_key__contains", value),
+                    ("batch__obj_name__contains", value),
+                    ("batch__initiator", value)
                 ]
 
             if key == "backlog_type" and value != "0":
                 conditions = {
                     "1": ("is_done", False),
                     "2": ("is_done", True),
-                    "3": ("initiator", receiver),
+                    "3": ("batch__initiator", receiver),
                     "4": ("is_done", False)
                 }
                 condition = [
@@ -155,7 +162,7 @@ def filter_conditions(receiver: str, params: dict):
                     "4": "撤回"
                 }
                 condition = [
-                    ("obj_status", flow_conditions.get(value))
+                    ("batch__obj_status", flow_conditions.get(value))
                 ]
 
             if key == "handle_status" and value != "0":
@@ -168,7 +175,7 @@ def filter_conditions(receiver: str, params: dict):
                 ]
 
             if key == "handler" and value != "0":
-                condition = [("candidates__contains", list(value))]
+                condition = [("batch__candidates__contains", list(value))]
 
             q.children.extend(condition)
             con.add(q, "AND")
@@ -176,78 +183,91 @@ def filter_conditions(receiver: str, params: dict):
     return con
 
 
+def serialize_backlog(item: Backlog):
+    """`item` with its batch: select_related('batch')"""
+    batch = item.batch
+    return {
+        "id": item.id,
+        "created_at": item.created_at.strftime(NOTICE_DATETIME_FORMAT),
+        "is_done": item.is_done,
+        "creator": batch.creator,
+        "handler": batch.handler,
+        "initiator": batch.initiator,
+        "initiator_name": batch.initiator_name,
+        "obj_key": batch.obj_key,
+        "obj_name": batch.obj_name,
+        "obj_status": batch.obj_status,
+        "data": {} if not batch.data else batch.data,
+        "is_read": item.is_read,
+        "candidates": batch.candidates
+    }
+
+
+def backlog_queryset(receiver: str, params: dict):
+    return Backlog.objects.filter(receiver=receiver).filter(
+        filter_conditions(receiver, params)
+    ).select_related('batch').order_by('-id')
+
+
 #  The backlog message list
 def list_backlog(page: int, size: int, params: dict, receiver: str):
-    is_valid, params = check_params(params)
-    if not is_valid:
-        return params
-
-    queryset = Backlog.objects.filter(receiver=receiver)
-    con = filter_conditions(receiver, params)
-    queryset = queryset.filter(con)
-    total = queryset.count()
-    max_page = math.ceil(total / size)
-
-    if page > max_page:
-        items = []
-    else:
-        items = [
-            {
-                "id": item.id,
-                "created_at": item.created_at.strftime(NOTICE_DATETIME_FORMAT),
-                "is_done": item.is_done,
-                "creator": item.creator,
-                "handler": item.handler,
-                "initiator": item.initiator,
-                "initiator_name": item.initiator_name,
-                "obj_key": item.obj_key,
-                "obj_name": item.obj_name,
-                "obj_status": item.obj_status,
-                "data": {} if not item.data else item.data,
-                "is_read": item.is_read,
-                "candidates": item.candidates
-            }
-            for item in queryset.order_by('-id')[(page - 1) * size: page * size]
-        ]
-
-    resp = {
-        'total': total,
-        'max_page': max_page,
-        'page': page,
-        'items': items,
-        "size": size
-    }
-    return JsonResponse(data=resp)
+    total, max_page, rows = paginate_by_page(backlog_queryset(receiver, params), page, size)
+    return page_response(total, max_page, page, size, [serialize_backlog(item) for item in rows])
 
 
-@require_http_methods(['GET'])
-def backlogs(request: HttpRequest):
-    if not request.user.is_authenticated:
-        return AuthFailed()
-    params = request.GET.dict()
+#  The backlog message list by keyset: resp={'items': [], 'next_cursor': null, 'size': 10}
+def cursor_backlog(cursor: str, size: int, params: dict, receiver: str):
+    rows, next_cursor = paginate_by_cursor(backlog_queryset(receiver, params), cursor, size)
+    return cursor_response([serialize_backlog(item) for item in rows], next_cursor, size)
+
+
+def check_backlogs_params(params: dict):
+    """
+    validate the backlogs/ query: (True, {'page', 'size', 'cursor', 'params'}) or (False, response),
+    `params` are the checked filter_conditions() params
+    """
+    params = dict(params)
     page = params.pop('page', "1")
     size = params.pop('size', "10")
+    cursor = params.pop('cursor', None)
 
     if not page.isdigit():
-        return ValidationFailed(ValidationFailedDetailEnum.PAGE.value)
+        return False, ValidationFailed(ValidationFailedDetailEnum.PAGE.value)
 
     if not size.isdigit():
-        return ValidationFailed(ValidationFailedDetailEnum.SIZE.value)
+        return False, ValidationFailed(ValidationFailedDetailEnum.SIZE.value)
 
     is_valid, params = check_params(params)
     if not is_valid:
-        return params
+        return False, params
+
+    if cursor is not None:
+        if cursor and decode_cursor(cursor) is None:
+            return False, ValidationFailed(ValidationFailedDetailEnum.CURSOR.value)
+        if not int(size):
+            return False, ValidationFailed(ValidationFailedDetailEnum.SIZE.value)
 
-    return list_backlog(int(page), int(size), params, str(request.user.pk))
+    return True, {'page': int(page), 'size': int(size), 'cursor': cursor, 'params': params}
+
+
+@require_http_methods(['GET'])
+def backlogs(request: HttpRequest):
+    if not request.user.is_authenticated:
+        return AuthFailed()
+
+    is_valid, query = check_backlogs_params(request.GET.dict())
+    if not is_valid:
+        return query
+
+    if query['cursor'] is not None:
+        return cursor_backlog(query['cursor'], query['size'], query['params'], str(request.user.pk))
+    return list_backlog(query['page'], query['size'], query['params'], str(request.user.pk))
 
 
 # The backlog message is set to read
 def backlog_read(pk: int, receiver: str):
-    if not Backlog.objects.filter(receiver=receiver).exists():
-        return NotFound()
-    if not Backlog.objects.filter(pk=pk).exists():
+    if not Backlog.objects.filter(receiver=receiver, id=pk).update(is_read=True, read_at=timezone.now()):
         return NotFound()
-    Backlog.objects.filter(receiver=receiver, id=pk).update(is_read=True, read_at=timezone.now())
     return JsonResponse(data={})
 
 
@@ -259,34 +279,127 @@ def read_backlog(request: HttpRequest, pk: int):
     return backlog_read(pk, str(request.user.pk))
 
 
-def handlers(receiver: str):
-    backlog_obj: Backlog = Backlog.objects.filter(initiator=receiver).first()
-    if not backlog_obj:
+# Set many backlog messages to read with one UPDATE: resp={'count': 3}
+def backlogs_read(receiver: str, ids: list = None, batch: str = None, params: dict = None):
+    queryset = Backlog.objects.filter(receiver=receiver, is_read=False)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    if batch is not None:
+        queryset = queryset.filter(batch=batch)
+    if params:
+        queryset = queryset.filter(filter_conditions(receiver, params))
+    count = queryset.update(is_read=True, read_at=timezone.now())
+    return JsonResponse(data={'count': count})
+
+
+@require_http_methods(["PUT"])
+def read_backlogs(request: HttpRequest):
+    if not request.user.is_authenticated:
+        return AuthFailed()
+
+    data = load_json_object(request.body)
+    if data is None:
+        return ValidationFailed(ValidationFailedDetailEnum.READ_SCOPE.value)
+    ids = data.get("ids")
+    batch = data.get("batch")
+    params = data.get("filters")
+    if ids is None and batch is None and params is None:
+        return ValidationFailed(ValidationFailedDetailEnum.READ_SCOPE.value)
+    if ids is not None and not is_int_list(ids):
+        return ValidationFailed(ValidationFailedDetailEnum.READ_SCOPE.value)
+    if batch is not None and not isinstance(batch, str):
+        return ValidationFailed(ValidationFailedDetailEnum.READ_SCOPE.value)
+    if params is not None:
+        if not isinstance(params, dict):
+            return ValidationFailed(ValidationFailedDetailEnum.READ_SCOPE.value)
+        is_valid, params = check_params({key: str(value) for key, value in params.items()})
+        if not is_valid:
+            return params
+
+    return backlogs_read(str(request.user.pk), ids=ids, batch=batch, params=params)
+
+
+# distinct candidates of the batches `initiator` launched, computed by Postgres
+HANDLERS_SQL = (
+    'SELECT DISTINCT candidate FROM {table}, unnest(candidates) candidate '
+    'WHERE initiator = %s AND candidate LIKE %s'
+).format(table=BacklogBatch._meta.db_table)
+
+
+def _prefix_pattern(prefix: str) -> str:
+    """LIKE pattern matching values that start with `prefix`"""
+    return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _handler_rows(initiator: str, prefix: str, limit: int = None, offset: int = 0):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            '{} ORDER BY candidate LIMIT %s OFFSET %s'.format(HANDLERS_SQL),
+            [initiator, _prefix_pattern(prefix), limit, offset]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _handler_count(initiator: str, prefix: str):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT count(*) FROM ({}) handlers'.format(HANDLERS_SQL), [initiator, _prefix_pattern(prefix)])
+        return cursor.fetchone()[0]
+
+
+# handlers of the backlogs launched by receiver: resp={'handler_list': []}, plus total/page/size when paged
+def handlers(receiver: str, page: int = 1, size: int = None, prefix: str = ''):
+    def build():
+        if not BacklogBatch.objects.filter(initiator=receiver).exists():
+            return None
+        if size is None:
+            return {"handler_list": _handler_rows(receiver, prefix)}
+        return {
+            "handler_list": _handler_rows(receiver, prefix, size, (page - 1) * size),
+            "total": _handler_count(receiver, prefix),
+            "page": page,
+            "size": size,
+        }
+
+    data = cached_handler_list(receiver, (page, size, prefix), build)
+    if data is None:
         return NotFound()
-    handler_infos: Backlog = Backlog.objects.filter(initiator=receiver).values("candidates")
-    handler_set = set()
-    for handler in handler_infos:
-        handler_set |= (set(handler.get("candidates")))
-    return JsonResponse({"handler_list": list(handler_set)})
+    return JsonResponse(data)
 
 
 @require_http_methods(["GET"])
 def handler_list(request: HttpRequest):
     if not request.user.is_authenticated:
         return AuthFailed()
+    params = request.GET
+    page = params.get('page', '1')
+    size = params.get('size')
+    prefix = params.get('prefix', '')
+
+    if not page.isdigit() or not int(page):
+        return ValidationFailed(ValidationFailedDetailEnum.PAGE.value)
 
-    return handlers(str(request.user.pk))
+    if size is not None:
+        if not size.isdigit() or not int(size):
+            return ValidationFailed(ValidationFailedDetailEnum.SIZE.value)
+        size = int(size)
+
+    return handlers(str(request.user.pk), int(page), size, prefix)
 
 
 # handle the current node backlog
 def current_node_backlog(pk: int, node_handlers: list, receiver: str):
-    if not Backlog.objects.filter(receiver=receiver, id=pk).exists():
+    row = Backlog.objects.filter(receiver=receiver, id=pk).values_list('batch_id', 'batch__initiator').first()
+    if not row:
         return NotFound()
-    batch = Backlog.objects.get(id=pk).batch
-    Backlog.objects.filter(batch=batch).update(
-        is_done=True, done_at=timezone.now(),
-        handler=node_handlers, candidates=node_handlers
-    )
+    batch, initiator = row
+    # the shared payload is one row, only the narrow receiver rows are touched per receiver
+    with transaction.atomic():
+        BacklogBatch.objects.filter(batch=batch).update(
+            done_at=timezone.now(), handler=node_handlers, candidates=node_handlers
+        )
+        Backlog.objects.filter(batch_id=batch).update(is_done=True)
+        transaction.on_commit(lambda: invalidate_handler_list(initiator))
+    publish_event(*Backlog.objects.filter(batch_id=batch).values_list('receiver', flat=True))
 
     return JsonResponse({})
 
@@ -4,128 +4,254 @@
 @Author  : Rey
 @Time    : 2022-04-02 10:24:24
 """
-import math
+from datetime import timedelta
 
+from django.db.models import Exists, OuterRef, Subquery
 from django.http import HttpRequest, JsonResponse
 from django.utils import timezone
-from django.views.decorators.http import require_GET
-from psycopg2.errors import UniqueViolation
+from django.views.decorators.http import require_GET, require_http_methods
 
-from notice.settings import NOTICE_ALLOWED_TYPED_CLASS
-from notice.models import NoticeStore, ReceiverTag
+from notice.cache import cached_notice_page, judge_allowed_types
+from notice.events import publish_event
+from notice.helpers import (
+    TITLE_SEARCH_MODES, decode_cursor, paginate_by_cursor, paginate_by_page, search_title, trigram_installed
+)
+from notice.settings import NOTICE_PUBLISH_SCHEDULER, NOTICE_RECEIPT_BUFFER, NOTICE_UNREAD_COUNT_LIMIT
+from notice.models import NoticeStore, ReceiverTag, ReceiverWatermark
+from notice.receipts import receipt_buffer
 from notice.response import AuthFailed, NotFound, ValidationFailed, ValidationFailedDetailEnum
 
 
-def get_page_notice(receiver, page, size, title=None, **kwargs):
-    allowed_notice_type_ids, allowed_receiver_type_ids = NOTICE_ALLOWED_TYPED_CLASS(receiver=receiver, **kwargs).judge()
-    if not allowed_notice_type_ids or not allowed_receiver_type_ids:
-        return JsonResponse(data={
-            'total': 0,
-            'max_page': 1,
-            'page': page,
-            'items': []
-        })
-
-    filter_params = {
+def _visible_params(allowed_notice_type_ids, allowed_receiver_type_ids):
+    if NOTICE_PUBLISH_SCHEDULER:
+        # flipped by the publish_notices command, served by notice_store_published_idx
+        return {
+            'is_published': True,
+            'receiver_type_ids__overlap': allowed_receiver_type_ids,
+            'notice_type_id__in': allowed_notice_type_ids,
+        }
+    return {
         'is_draft': False,
         'publish_at__lte': timezone.now(),
         'receiver_type_ids__overlap': allowed_receiver_type_ids,
         'notice_type_id__in': allowed_notice_type_ids,
     }
-    if title:
-        filter_params['title__contains'] = title
-    total = NoticeStore.objects.filter(**filter_params).count()
-    max_page = math.ceil(total / size)
 
-    items = [
+
+def watermark_queryset(receiver):
+    return ReceiverWatermark.objects.filter(receiver=receiver).values_list('read_until', flat=True)
+
+
+def _read_until(receiver):
+    return watermark_queryset(receiver).first()
+
+
+def page_rows(rows):
+    """receiver independent part of a list page, safe to share through the page cache"""
+    return [
         {
-            'id': item.id,
-            'title': item.title,
-            'publish_at': item.published_at,
+            'id': row.id,
+            'title': row.title,
+            'publish_at': row.published_at,
+            'published': row.publish_at,
         }
-        for item in NoticeStore.objects.filter(
-            **filter_params
-        ).only(
-            'title', 'publish_at', 'is_draft'
-        ).order_by('-id')[(page-1)*size: page*size]
-    ] if page <= max_page else []
-
-    if items:
-        tags = ReceiverTag.objects.filter(
-            receiver=receiver, noticestore_id__in=[i['id'] for i in items]
-        ).values_list('noticestore_id', flat=True)
-        for item in items:
-            if item['id'] in tags:
-                item['is_read'] = True
-            else:
-                item['is_read'] = False
+        for row in rows
+    ]
 
+
+def above_watermark(rows, read_until) -> set:
+    """ids of `rows` published after the watermark: only those need their read tag looked up"""
+    return {row['id'] for row in rows if read_until is None or row['published'] > read_until}
+
+
+def tag_ids(receiver, ids):
+    return ReceiverTag.objects.filter(receiver=receiver, noticestore_id__in=ids).values_list('noticestore_id', flat=True)
+
+
+def serialize_notices(rows, above: set, tags: set):
+    """overlay is_read: read below the receiver's watermark, else when tagged"""
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'publish_at': row['publish_at'],
+            'is_read': row['id'] not in above or row['id'] in tags,
+        }
+        for row in rows
+    ]
+
+
+def _notice_items(receiver, rows):
+    if not rows:
+        return []
+    above = above_watermark(rows, _read_until(receiver))
+    tags = set(tag_ids(receiver, above)) if above else set()
+    return serialize_notices(rows, above, tags)
+
+
+def notice_queryset(allowed_notice_type_ids, allowed_receiver_type_ids, title, search):
+    queryset = NoticeStore.objects.filter(**_visible_params(allowed_notice_type_ids, allowed_receiver_type_ids))
+    return search_title(queryset, title, search).only('title', 'publish_at', 'is_draft', 'is_published')
+
+
+def page_key(kind, allowed_notice_type_ids, allowed_receiver_type_ids, *parts):
+    """cache key parts of a list page: everything it depends on except the receiver"""
+    return (kind, sorted(allowed_notice_type_ids), sorted(allowed_receiver_type_ids)) + parts
+
+
+def notice_page_response(page, data, items):
     return JsonResponse(data={
-        'total': total,
-        'max_page': max_page,
+        'total': data['total'],
+        'max_page': data['max_page'],
         'page': page,
         'items': items
     })
 
 
-@require_GET
-def list_notice(request: HttpRequest):
-    if not request.user.is_authenticated:
-        return AuthFailed()
+def notice_cursor_response(data, items, size):
+    return JsonResponse(data={
+        'items': items,
+        'next_cursor': data['next_cursor'],
+        'size': size,
+    })
+
+
+EMPTY_PAGE = {'total': 0, 'max_page': 1, 'next_cursor': None}
+
+
+def get_page_notice(receiver, page, size, title=None, search='contains', **kwargs):
+    allowed_notice_type_ids, allowed_receiver_type_ids = judge_allowed_types(receiver, **kwargs)
+    if not allowed_notice_type_ids or not allowed_receiver_type_ids:
+        return notice_page_response(page, EMPTY_PAGE, [])
+
+    def build():
+        total, max_page, rows = paginate_by_page(
+            notice_queryset(allowed_notice_type_ids, allowed_receiver_type_ids, title, search), page, size
+        )
+        return {'total': total, 'max_page': max_page, 'rows': page_rows(rows)}
+
+    data = cached_notice_page(
+        page_key('page', allowed_notice_type_ids, allowed_receiver_type_ids, title, search, page, size), build
+    )
+    return notice_page_response(page, data, _notice_items(receiver, data['rows']))
+
+
+def get_cursor_notice(receiver, cursor, size, title=None, search='contains', **kwargs):
+    """keyset pagination on `id < last_id`, without count: no `similar` search"""
+    allowed_notice_type_ids, allowed_receiver_type_ids = judge_allowed_types(receiver, **kwargs)
+    if not allowed_notice_type_ids or not allowed_receiver_type_ids:
+        return notice_cursor_response(EMPTY_PAGE, [], size)
+
+    def build():
+        rows, next_cursor = paginate_by_cursor(
+            notice_queryset(allowed_notice_type_ids, allowed_receiver_type_ids, title, search), cursor, size
+        )
+        return {'rows': page_rows(rows), 'next_cursor': next_cursor}
+
+    data = cached_notice_page(
+        page_key('cursor', allowed_notice_type_ids, allowed_receiver_type_ids, title, search, cursor, size), build
+    )
+    return notice_cursor_response(data, _notice_items(receiver, data['rows']), size)
 
-    params = request.GET
+
+def check_list_params(params):
+    """validate the client/ query: (True, {'page', 'size', 'title', 'search', 'cursor'}) or (False, response)"""
     page = params.get('page', '1')
     if not page.isdigit():
-        return ValidationFailed(ValidationFailedDetailEnum.PAGE.value)
-    page = int(page)
+        return False, ValidationFailed(ValidationFailedDetailEnum.PAGE.value)
 
     size = params.get('size', '10')
     if not size.isdigit():
-        return ValidationFailed(ValidationFailedDetailEnum.SIZE.value)
-    size = int(size)
+        return False, ValidationFailed(ValidationFailedDetailEnum.SIZE.value)
+
+    search = params.get('search', 'contains')
+    if search not in TITLE_SEARCH_MODES:
+        return False, ValidationFailed(ValidationFailedDetailEnum.SEARCH.value)
+
+    if search == 'similar' and not trigram_installed():
+        return False, ValidationFailed(ValidationFailedDetailEnum.SEARCH.value)
+
+    # None: page based, '' or a token: keyset based
+    cursor = params.get('cursor')
+    if cursor is not None:
+        if cursor and decode_cursor(cursor) is None:
+            return False, ValidationFailed(ValidationFailedDetailEnum.CURSOR.value)
+        if not int(size):
+            return False, ValidationFailed(ValidationFailedDetailEnum.SIZE.value)
+        if search == 'similar':
+            return False, ValidationFailed(ValidationFailedDetailEnum.SEARCH.value)
+
+    return True, {
+        'page': int(page),
+        'size': int(size),
+        'title': params.get('title', ''),
+        'search': search,
+        'cursor': cursor,
+    }
+
+
+@require_GET
+def list_notice(request: HttpRequest):
+    if not request.user.is_authenticated:
+        return AuthFailed()
+
+    is_valid, query = check_list_params(request.GET)
+    if not is_valid:
+        return query
+
+    receiver = str(request.user.pk)
+    if query['cursor'] is not None:
+        return get_cursor_notice(receiver, query['cursor'], query['size'], query['title'], query['search'])
+    return get_page_notice(receiver, query['page'], query['size'], query['title'], query['search'])
+
+
+def detail_queryset(receiver, pk, allowed_notice_type_ids, allowed_receiver_type_ids):
+    filter_params = _visible_params(allowed_notice_type_ids, allowed_receiver_type_ids)
+    filter_params['pk'] = pk
+    return NoticeStore.objects.filter(**filter_params).only(
+        'publish_at', 'title', 'content', 'is_draft', 'is_published'
+    ).annotate(
+        read_until=Subquery(watermark_queryset(receiver).values('read_until')[:1])
+    )
 
-    title = params.get('title', '')
 
-    return get_page_notice(str(request.user.pk), page, size, title)
+def below_watermark(notice) -> bool:
+    """already read through the watermark, no tag needed"""
+    return bool(notice.read_until) and notice.publish_at <= notice.read_until
+
+
+def read_tag(receiver, pk):
+    return ReceiverTag(receiver=receiver, noticestore_id=pk, read_at=timezone.now())
+
+
+def detail_response(notice):
+    return JsonResponse(data={
+        'id': notice.id,
+        'title': notice.title,
+        'content': notice.content,
+        'publish_at': notice.published_at,
+    })
 
 
 def retrieve_notice(receiver, pk, **kwargs):
-    allowed_notice_type_ids, allowed_receiver_type_ids = NOTICE_ALLOWED_TYPED_CLASS(receiver, **kwargs).judge()
+    allowed_notice_type_ids, allowed_receiver_type_ids = judge_allowed_types(receiver, **kwargs)
     if not allowed_notice_type_ids or not allowed_receiver_type_ids:
         return NotFound()
 
-    filter_params = {
-        'is_draft': False,
-        'publish_at__lte': timezone.now(),
-        'receiver_type_ids__overlap': allowed_receiver_type_ids,
-        'notice_type_id__in': allowed_notice_type_ids,
-        'pk': pk
-    }
-    notice = NoticeStore.objects.filter(**filter_params).only(
-        'publish_at', 'title', 'content', 'is_draft'
-    ).first()
+    notice = detail_queryset(receiver, pk, allowed_notice_type_ids, allowed_receiver_type_ids).first()
     if not notice:
         return NotFound()
 
-    if not ReceiverTag.objects.filter(
-        receiver=receiver, noticestore_id=pk
-    ).exists():
-        try:
-            ReceiverTag.objects.create(
-                receiver=receiver,
-                noticestore_id=pk,
-                read_at=timezone.now()
-            )
-        except UniqueViolation:
-            pass
-
-    resp = {
-        'id': notice.id,
-        'title': notice.title,
-        'content': notice.content,
-        'publish_at': notice.published_at,
-    }
-    return JsonResponse(data=resp)
+    if below_watermark(notice):
+        pass
+    elif NOTICE_RECEIPT_BUFFER:
+        receipt_buffer.put(receiver, pk)
+    else:
+        # INSERT ... ON CONFLICT DO NOTHING against notice_receiver_tag_unique
+        ReceiverTag.objects.bulk_create([read_tag(receiver, pk)], ignore_conflicts=True)
+        publish_event(receiver)
+
+    return detail_response(notice)
 
 
 @require_GET
@@ -136,17 +262,35 @@ def some_notice(request: HttpRequest, pk: int):
     return retrieve_notice(str(request.user.pk), pk)
 
 
+def unread_queryset(receiver, allowed_notice_type_ids, allowed_receiver_type_ids, read_until):
+    filter_params = _visible_params(allowed_notice_type_ids, allowed_receiver_type_ids)
+    if read_until:
+        filter_params['publish_at__gt'] = read_until
+    # NOT EXISTS anti-join, driven by notice_receiver_tag_unique
+    unread = NoticeStore.objects.filter(**filter_params).filter(
+        ~Exists(ReceiverTag.objects.filter(receiver=receiver, noticestore_id=OuterRef('pk')))
+    )
+    if NOTICE_UNREAD_COUNT_LIMIT:
+        unread = unread[:NOTICE_UNREAD_COUNT_LIMIT]
+    return unread
+
+
+def count_unread_notice(receiver, **kwargs) -> int:
+    allowed_notice_type_ids, allowed_receiver_type_ids = judge_allowed_types(receiver, **kwargs)
+    if not allowed_notice_type_ids or not allowed_receiver_type_ids:
+        return 0
+
+    return unread_queryset(
+        receiver, allowed_notice_type_ids, allowed_receiver_type_ids, _read_until(receiver)
+    ).count()
+
+
+def status_response(unread_total: int):
+    return JsonResponse(data={'is_unread': unread_total > 0, 'unread': unread_total})
+
+
 def get_unread_status(receiver, **kwargs):
-    allowed_notice_type_ids, allowed_receiver_type_ids = NOTICE_ALLOWED_TYPED_CLASS(receiver=receiver, **kwargs).judge()
-    filter_params = {
-        'is_draft': False,
-        'publish_at__lte': timezone.now(),
-        'receiver_type_ids__overlap': allowed_receiver_type_ids,
-        'notice_type_id__in': allowed_notice_type_ids,
-    }
-    total = NoticeStore.objects.filter(**filter_params).count()
-    read_total = ReceiverTag.objects.filter(receiver=receiver).count()
-    return JsonResponse(data={'is_unread': False if total == read_total else True})
+    return status_response(count_unread_notice(receiver, **kwargs))
 
 
 @require_GET
@@ -154,3 +298,44 @@ def notice_status(request: HttpRequest):
     if not request.user.is_authenticated:
         return AuthFailed()
     return get_unread_status(str(request.user.pk))
+
+
+def _watermark_bound(now):
+    """
+    highest safe watermark: with the scheduler a timing notice that is due but not yet flipped
+    is still invisible, so the watermark stays below the first of them
+    """
+    if not NOTICE_PUBLISH_SCHEDULER:
+        return now
+    pending = NoticeStore.objects.filter(
+        is_draft=False, is_published=False, publish_at__lte=now
+    ).order_by('publish_at').values_list('publish_at', flat=True).first()
+    return now if pending is None else pending - timedelta(microseconds=1)
+
+
+def read_all_notice(receiver, **kwargs):
+    """move the receiver's watermark up to now and drop the tags it makes redundant"""
+    now = timezone.now()
+    read_until = _watermark_bound(now)
+    ReceiverWatermark.objects.update_or_create(receiver=receiver, defaults={'read_until': read_until})
+    ReceiverTag.all_objects.filter(receiver=receiver, noticestore__publish_at__lte=read_until).delete()
+    if read_until < now:
+        # notices published above the bound are read through tags
+        allowed_notice_type_ids, allowed_receiver_type_ids = judge_allowed_types(receiver, **kwargs)
+        if allowed_notice_type_ids and allowed_receiver_type_ids:
+            filter_params = _visible_params(allowed_notice_type_ids, allowed_receiver_type_ids)
+            ReceiverTag.objects.bulk_create([
+                ReceiverTag(receiver=receiver, noticestore_id=pk, read_at=now)
+                for pk in NoticeStore.objects.filter(
+                    **filter_params, publish_at__gt=read_until
+                ).values_list('id', flat=True)
+            ], ignore_conflicts=True)
+    publish_event(receiver)
+    return JsonResponse(data={})
+
+
+@require_http_methods(['PUT'])
+def read_notice(request: HttpRequest):
+    if not request.user.is_authenticated:
+        return AuthFailed()
+    return read_all_notice(str(request.user.pk))
@@ -0,0 +1,68 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : streaming export of backlogs and private notices
+@Author  : Rey
+@Time    : 2026-10-18 15:30:00
+"""
+import json
+
+from django.http import HttpRequest, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from notice.exports import (
+    BACKLOG_EXPORT_FIELDS, EXPORT_FORMATS, PRIVATE_EXPORT_FIELDS,
+    backlog_export_queryset, export_lines, needs_receiver, private_export_queryset
+)
+from notice.response import AuthFailed, ValidationFailed, ValidationFailedDetailEnum
+from notice.views.backlog import check_params
+
+
+def _export_receiver(request: HttpRequest, params: dict):
+    """staff may export anyone (`receiver`) or everyone (no `receiver`), other users only themselves"""
+    receiver = params.pop('receiver', None)
+    if request.user.is_staff:
+        return receiver
+    return str(request.user.pk)
+
+
+def _export_response(lines, fmt: str, name: str):
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = 'attachment; filename="{}.{}"'.format(name, fmt)
+    return response
+
+
+# export backlogs: ?format=ndjson|csv[&receiver=1] plus the backlogs/ filters, backlog_type=3 only for one receiver
+@require_GET
+def export_backlogs(request: HttpRequest):
+    if not request.user.is_authenticated:
+        return AuthFailed()
+    params = request.GET.dict()
+    fmt = params.pop('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return ValidationFailed(ValidationFailedDetailEnum.EXPORT_FORMAT.value)
+    receiver = _export_receiver(request, params)
+
+    is_valid, params = check_params(params)
+    if not is_valid:
+        return params
+    if receiver is None and needs_receiver(params):
+        return ValidationFailed(ValidationFailedDetailEnum.BACKLOG_TYPE.value)
+
+    lines = export_lines(backlog_export_queryset(receiver, params), BACKLOG_EXPORT_FIELDS, fmt)
+    return _export_response(lines, fmt, 'backlogs')
+
+
+# export private notices: ?format=ndjson|csv[&receiver=1][&title=x][&is_index=true]
+@require_GET
+def export_privates(request: HttpRequest):
+    if not request.user.is_authenticated:
+        return AuthFailed()
+    params = request.GET.dict()
+    fmt = params.pop('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return ValidationFailed(ValidationFailedDetailEnum.EXPORT_FORMAT.value)
+    receiver = _export_receiver(request, params)
+    is_index = json.loads(params.get('is_index', 'false'))
+
+    lines = export_lines(private_export_queryset(receiver, params.get('title'), is_index), PRIVATE_EXPORT_FIELDS, fmt)
+    return _export_response(lines, fmt, 'privates')
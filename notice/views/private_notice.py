@@ -5,16 +5,21 @@
 @Time    : 2022-04-27 13:25:37
 """
 import json
-import math
 
 from django.utils import timezone
 from django.http import JsonResponse, HttpRequest
 from django.views.decorators.http import require_http_methods
 
+from notice.events import publish_event
 from notice.forms import PrivateForm
+from notice.helpers import (
+    TITLE_SEARCH_MODES, cursor_response, decode_cursor, is_int, is_int_list, load_json_object, page_response,
+    paginate_by_cursor, paginate_by_page, search_title, trigram_installed
+)
+from notice.ingest import create_private_notices
 from notice.models import PrivateNotice
 from notice.response import AuthFailed, NotFound, ValidationFailed, ValidationFailedDetailEnum
-from notice.settings import NOTICE_DATETIME_FORMAT
+from notice.settings import NOTICE_DATETIME_FORMAT, NOTICE_PRIVATE_COPY_THRESHOLD
 
 
 # check if exist unread private notice: resp={'undo': false}
@@ -31,7 +36,7 @@ def unread_private(receiver: str):
     return JsonResponse(data={'undo': is_read})
 
 
-# create private notice:
+# create private notice: resp={'count': 3, 'batch': 'uuid', 'id': [1, 2, 3]}, 'id' only for a single batch send
 def create_private(data: dict, receivers: list, creator: str):
 
     if not isinstance(receivers, list):
@@ -44,10 +49,13 @@ def create_private(data: dict, receivers: list, creator: str):
     data = f.cleaned_data
     data['creator'] = creator
     data.pop("receiver")
-    private_notices = [PrivateNotice(**data, receiver=receiver) for receiver in receivers]
+    use_copy = bool(NOTICE_PRIVATE_COPY_THRESHOLD) and len(receivers) >= NOTICE_PRIVATE_COPY_THRESHOLD
+    count, batch, ids = create_private_notices(data, receivers, use_copy=use_copy)
 
-    private_objs = PrivateNotice.objects.bulk_create(private_notices)
-    return JsonResponse(data={'id': [private_notice.id for private_notice in private_objs]})
+    resp = {'count': count, 'batch': batch}
+    if ids is not None:
+        resp['id'] = ids
+    return JsonResponse(data=resp)
 
 
 @require_http_methods(["GET", "POST"])
@@ -65,63 +73,92 @@ def private(request: HttpRequest):
     return unread_private(receiver)
 
 
-# list private notice
-def list_private(page: int, size: int, title: str, is_index: bool, receiver: str):
-    queryset = PrivateNotice.objects.filter(receiver=receiver)
+def serialize_private(item: PrivateNotice):
+    """`item` with its message: select_related('batch')"""
+    return {
+        "id": item.id,
+        "created_at": item.created_at.strftime(NOTICE_DATETIME_FORMAT),
+        "title": item.batch.title,
+        "data": item.batch.data,
+        "is_read": item.is_read
+    }
+
+
+def filter_private(title: str, is_index: bool, receiver: str, search: str = 'contains'):
+    queryset = PrivateNotice.objects.filter(receiver=receiver).select_related('batch')
 
     if is_index:
         queryset = queryset.filter(is_read=False)
 
-    if title:
-        queryset = queryset.filter(title__contains=title)
-
-    total = queryset.count()
-    max_page = math.ceil(total / size)
-
-    if page > max_page:
-        items = []
-    else:
-        items = [
-            {
-                "id": item.id,
-                "created_at": item.created_at.strftime(NOTICE_DATETIME_FORMAT),
-                "title": item.title,
-                "data": item.data,
-                "is_read": item.is_read
-            }
-            for item in queryset.order_by('-id')[(page - 1) * size: page * size]
-        ]
+    return search_title(queryset, title, search, field='batch__title')
 
-    resp = {
-        'total': total,
-        'max_page': max_page,
-        'page': page,
-        'items': items,
-        "size": size
-    }
-    return JsonResponse(data=resp)
 
+# list private notice
+def list_private(page: int, size: int, title: str, is_index: bool, receiver: str, search: str = 'contains'):
+    total, max_page, rows = paginate_by_page(filter_private(title, is_index, receiver, search), page, size)
+    return page_response(total, max_page, page, size, [serialize_private(item) for item in rows])
 
-@require_http_methods(['GET'])
-def privates(request: HttpRequest):
-    if not request.user.is_authenticated:
-        return AuthFailed()
-    params = request.GET
-    title = params.get('title')
+
+# list private notice by keyset: resp={'items': [], 'next_cursor': null, 'size': 10}
+def cursor_private(cursor: str, size: int, title: str, is_index: bool, receiver: str, search: str = 'contains'):
+    rows, next_cursor = paginate_by_cursor(filter_private(title, is_index, receiver, search), cursor, size)
+    return cursor_response([serialize_private(item) for item in rows], next_cursor, size)
+
+
+def check_privates_params(params):
+    """
+    validate the privates/ query:
+    (True, {'page', 'size', 'title', 'is_index', 'search', 'cursor'}) or (False, response)
+    """
     page = params.get('page', '1')
     size = params.get('size', '10')
-    is_index = json.loads(params.get("is_index", 'false'))
+    search = params.get('search', 'contains')
 
     if not page.isdigit():
-        return ValidationFailed(ValidationFailedDetailEnum.PAGE.value)
+        return False, ValidationFailed(ValidationFailedDetailEnum.PAGE.value)
 
     if not size.isdigit():
-        return ValidationFailed(ValidationFailedDetailEnum.SIZE.value)
+        return False, ValidationFailed(ValidationFailedDetailEnum.SIZE.value)
+
+    if search not in TITLE_SEARCH_MODES:
+        return False, ValidationFailed(ValidationFailedDetailEnum.SEARCH.value)
+
+    if search == 'similar' and not trigram_installed():
+        return False, ValidationFailed(ValidationFailedDetailEnum.SEARCH.value)
+
+    cursor = params.get('cursor')
+    if cursor is not None:
+        if cursor and decode_cursor(cursor) is None:
+            return False, ValidationFailed(ValidationFailedDetailEnum.CURSOR.value)
+        if not int(size):
+            return False, ValidationFailed(ValidationFailedDetailEnum.SIZE.value)
+        if search == 'similar':
+            return False, ValidationFailed(ValidationFailedDetailEnum.SEARCH.value)
+
+    return True, {
+        'page': int(page),
+        'size': int(size),
+        'title': params.get('title'),
+        'is_index': json.loads(params.get("is_index", 'false')),
+        'search': search,
+        'cursor': cursor,
+    }
+
+
+@require_http_methods(['GET'])
+def privates(request: HttpRequest):
+    if not request.user.is_authenticated:
+        return AuthFailed()
 
-    page = int(page)
-    size = int(size)
+    is_valid, query = check_privates_params(request.GET)
+    if not is_valid:
+        return query
 
-    return list_private(page, size, title, is_index, str(request.user.pk))
+    cursor = query.pop('cursor')
+    page = query.pop('page')
+    if cursor is not None:
+        return cursor_private(cursor, receiver=str(request.user.pk), **query)
+    return list_private(page, receiver=str(request.user.pk), **query)
 
 
 # get a private notice detail
@@ -129,26 +166,63 @@ def private_detail(pk: int, receiver: str):
     private_obj: PrivateNotice = PrivateNotice.objects.filter(
         pk=pk,
         receiver=receiver
-    ).only("id", "title", "content", "created_at", "data").first()
-    if not private:
+    ).select_related("batch").only(
+        "id", "created_at", "batch__title", "batch__content", "batch__data"
+    ).first()
+    if not private_obj:
         return NotFound()
 
+    message = private_obj.batch
     resp = {
         "id": private_obj.id,
-        "title": private_obj.title,
-        "content": private_obj.content,
+        "title": message.title,
+        "content": message.content,
         "created_at": private_obj.created_at.strftime(NOTICE_DATETIME_FORMAT),
-        "data": {} if not private_obj.data else private_obj.data
+        "data": {} if not message.data else message.data
     }
     return JsonResponse(data=resp)
 
 
 # finish private
 def finish_private(pk: int, receiver: str):
-    PrivateNotice.objects.filter(receiver=receiver, id=pk).update(is_read=True, read_at=timezone.now())
+    if PrivateNotice.objects.filter(receiver=receiver, id=pk).update(is_read=True, read_at=timezone.now()):
+        publish_event(receiver)
     return JsonResponse(data={})
 
 
+# mark many private notices read with one UPDATE: resp={'count': 3}
+def read_privates(receiver: str, ids: list = None, max_id: int = None):
+    queryset = PrivateNotice.objects.filter(receiver=receiver, is_read=False)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    if max_id is not None:
+        queryset = queryset.filter(id__lte=max_id)
+    count = queryset.update(is_read=True, read_at=timezone.now())
+    if count:
+        publish_event(receiver)
+    return JsonResponse(data={'count': count})
+
+
+@require_http_methods(["PUT"])
+def read_private_notices(request: HttpRequest):
+    if not request.user.is_authenticated:
+        return AuthFailed()
+
+    data = load_json_object(request.body)
+    if data is None:
+        return ValidationFailed(ValidationFailedDetailEnum.READ_SCOPE.value)
+    ids = data.get('ids')
+    max_id = data.get('max_id')
+    if ids is None and max_id is None:
+        return ValidationFailed(ValidationFailedDetailEnum.READ_SCOPE.value)
+    if ids is not None and not is_int_list(ids):
+        return ValidationFailed(ValidationFailedDetailEnum.READ_SCOPE.value)
+    if max_id is not None and not is_int(max_id):
+        return ValidationFailed(ValidationFailedDetailEnum.READ_SCOPE.value)
+
+    return read_privates(str(request.user.pk), ids=ids, max_id=max_id)
+
+
 @require_http_methods(["GET", "PUT"])
 def private_notice_detail(request: HttpRequest, pk: int):
     if not request.user.is_authenticated:
@@ -0,0 +1,77 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : server-sent events stream of unread counts, mounted from notice.async_urls only (ASGI)
+@Author  : Rey
+@Time    : 2026-10-18 14:00:00
+"""
+import asyncio
+import json
+import random
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, StreamingHttpResponse
+
+from notice.events import BROADCAST, broker
+from notice.models import Backlog, PrivateNotice
+from notice.response import AuthFailed
+from notice.settings import NOTICE_STREAM_BROADCAST_JITTER, NOTICE_STREAM_HEARTBEAT, NOTICE_STREAM_RETRY
+from notice.views.client import count_unread_notice
+
+
+def unread_counts(receiver: str) -> dict:
+    return {
+        'notice': count_unread_notice(receiver),
+        'private': PrivateNotice.objects.filter(receiver=receiver, is_read=False).count(),
+        'backlog': Backlog.objects.filter(receiver=receiver, is_done=False).count(),
+    }
+
+
+def _event(event_id: int, counts: dict) -> str:
+    return 'id: {}\nevent: counts\ndata: {}\n\n'.format(event_id, json.dumps(counts))
+
+
+async def event_stream(receiver: str):
+    """
+    `counts` on connect and whenever they change, a comment line every NOTICE_STREAM_HEARTBEAT seconds
+
+    a reconnecting client always gets a fresh snapshot, so Last-Event-ID needs no replay
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    broker.subscribe(receiver, loop, queue)
+    broker.subscribe(BROADCAST, loop, queue)
+    try:
+        yield 'retry: {}\n\n'.format(NOTICE_STREAM_RETRY)
+        event_id = 1
+        counts = await sync_to_async(unread_counts)(receiver)
+        yield _event(event_id, counts)
+        while True:
+            try:
+                topic = await asyncio.wait_for(queue.get(), NOTICE_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ': heartbeat\n\n'
+                continue
+            if topic == BROADCAST and NOTICE_STREAM_BROADCAST_JITTER:
+                # spread the recount of every open stream after a broadcast notice
+                await asyncio.sleep(random.uniform(0, NOTICE_STREAM_BROADCAST_JITTER))
+            while not queue.empty():
+                queue.get_nowait()
+            latest = await sync_to_async(unread_counts)(receiver)
+            if latest != counts:
+                counts = latest
+                event_id += 1
+                yield _event(event_id, counts)
+    finally:
+        broker.unsubscribe(receiver, loop, queue)
+        broker.unsubscribe(BROADCAST, loop, queue)
+
+
+async def notice_stream(request: HttpRequest):
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    if user is None:
+        return AuthFailed()
+
+    response = StreamingHttpResponse(event_stream(str(user.pk)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
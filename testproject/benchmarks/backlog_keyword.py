@@ -0,0 +1,120 @@
+# -*- coding: UTF-8 -*-
+"""
+@Summary : keyword search latency of backlogs/ for one receiver with many backlogs, next to other receivers' backlogs
+@Author  : Rey
+@Time    : 2026-10-18 18:30:00
+@Run     : cd testproject && python benchmarks/backlog_keyword.py [--rows 1000000] [--other-rows 1000000] [--repeat 20]
+
+rows are generated with generate_series inside a transaction that is rolled back at the end,
+every keyword is timed with the join on notice_backlog_batch of filter_conditions() and with a `batch IN (subquery)`
+that matches batches first; the subquery only pays off with the trigram indexes of 0021, compare with --explain
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [PROJECT_DIR, os.path.dirname(PROJECT_DIR)]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'testproject.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Q  # noqa: E402
+
+from notice.models import Backlog, BacklogBatch  # noqa: E402
+from notice.views.backlog import filter_conditions  # noqa: E402
+
+
+RECEIVER = 'benchmark'
+
+KEYWORDS = (
+    ('selective obj_key', 'KEY-0424242'),
+    ('obj_name', 'flow 0777'),
+    ('initiator', '42'),
+    ('no match', 'nothing-like-this'),
+)
+
+
+def subquery_condition(keyword: str):
+    """matching batches first: BitmapOr of the obj_key/obj_name trigram and initiator indexes"""
+    return Q(batch__in=BacklogBatch.objects.filter(
+        Q(obj_key__contains=keyword) | Q(obj_name__contains=keyword) | Q(initiator=keyword)
+    ).values('batch'))
+
+
+SHAPES = (
+    ('join', lambda keyword: filter_conditions(RECEIVER, {'keyword': keyword})),
+    ('subquery', subquery_condition),
+)
+
+
+def populate(rows: int, other_rows: int):
+    """`rows` backlogs of RECEIVER, `other_rows` backlogs of 1000 other receivers, one batch each"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO notice_backlog_batch "
+            "(created_at, updated_at, batch, creator, initiator, initiator_name, obj_key, obj_name, obj_status, candidates) "
+            "SELECT now(), now(), 'bench-' || g, '1', (g %% 500)::text, 'user ' || (g %% 500), "
+            "'KEY-' || lpad(g::text, 7, '0'), 'flow ' || lpad((g %% 1000)::text, 4, '0'), '进行中', "
+            "ARRAY[(g %% 97)::text, (g %% 89)::text] FROM generate_series(1, %s) g",
+            [rows + other_rows]
+        )
+        cursor.execute(
+            "INSERT INTO notice_backlog (created_at, updated_at, batch, receiver, is_read, is_done) "
+            "SELECT now(), now(), 'bench-' || g, CASE WHEN g <= %s THEN %s ELSE 'other-' || (g %% 1000) END, "
+            "false, g %% 3 = 0 FROM generate_series(1, %s) g",
+            [rows, RECEIVER, rows + other_rows]
+        )
+        cursor.execute('ANALYZE notice_backlog_batch')
+        cursor.execute('ANALYZE notice_backlog')
+
+
+def measure(condition, repeat: int):
+    """the count and first page queries of list_backlog"""
+    queryset = Backlog.objects.filter(receiver=RECEIVER).filter(condition).select_related('batch')
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        total = queryset.count()
+        list(queryset.order_by('-id')[:10])
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    return total, statistics.median(timings), p95, queryset.order_by('-id')[:10]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--other-rows', type=int, default=1000000, help="backlogs of other receivers")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--explain', action='store_true', help='print the plan of each page query')
+    args = parser.parse_args()
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT indexname FROM pg_indexes WHERE indexname LIKE %s', ['notice_backlog_%_trgm'])
+        trgm = [row[0] for row in cursor.fetchall()]
+    print('trigram indexes: {}'.format(', '.join(trgm) or 'none, pg_trgm is not installed'))
+
+    with transaction.atomic():
+        start = time.perf_counter()
+        populate(args.rows, args.other_rows)
+        print('populated {} + {} backlogs in {:.1f}s'.format(args.rows, args.other_rows, time.perf_counter() - start))
+
+        print('{:<20} {:<10} {:>8} {:>12} {:>12}'.format('keyword', 'shape', 'matches', 'median ms', 'p95 ms'))
+        for label, keyword in KEYWORDS:
+            for shape, condition in SHAPES:
+                total, median, p95, page = measure(condition(keyword), args.repeat)
+                print('{:<20} {:<10} {:>8} {:>12.2f} {:>12.2f}'.format(label, shape, total, median, p95))
+                if args.explain:
+                    print(page.explain(analyze=True))
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,4 +22,5 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('testproject/', ListNoticeView.as_view()),
     path('notice/', include('notice.urls')),
+    path('notice/async/', include('notice.async_urls')),
 ]